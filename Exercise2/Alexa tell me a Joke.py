@@ -1,14 +1,406 @@
 import tkinter as tk
 from tkinter import messagebox
+import array
+import csv
+import hashlib
+import json
+import locale
+import mmap
+import os
+import queue
 import random
+import struct
+import sys
+import tempfile
+import threading
+
+JOKES_PATH = r"C:\Users\saeza\OneDrive\Desktop\A1 Advanced Programming\Exercise 2\jokes.txt"
+# same encoding open(..., "r") used when the whole file was read as text
+ENCODING = locale.getpreferredencoding(False)
+
+
+# Each kind of joke file gets its own reader. They all give back
+# (line number, the line, setup, punchline) - setup or punchline is "" when
+# the line isn't a proper joke, and blank lines are just skipped.
+#   .txt   - one "setup?punchline" per line (like jokes.txt)
+#   .csv   - setup,punchline columns (a "setup,punchline" header row is fine)
+#   .jsonl - one {"setup": ..., "punchline": ...} or {"joke": "setup?punchline"} per line
+# Sources: https://docs.python.org/3/library/csv.html, https://jsonlines.org/
+def split_joke(text):
+    setup, mark, punchline = text.partition("?")
+    setup, punchline = setup.strip(), punchline.strip()
+    return (setup + mark if setup else ""), punchline
+
+
+def text_jokes(path):
+    with open(path, "rb") as f:
+        for number, line in enumerate(f, 1):
+            line = line.decode(ENCODING, errors="replace").strip()
+            if line:
+                yield (number, line) + split_joke(line)
+
+
+def csv_jokes(path):
+    with open(path, newline="", encoding="utf-8-sig", errors="replace") as f:
+        reader = csv.reader(f)
+        for row in reader:
+            row = [cell.strip() for cell in row]
+            if not any(row) or [cell.lower() for cell in row[:2]] == ["setup", "punchline"]:
+                continue
+            if len(row) == 1:
+                yield (reader.line_num, row[0]) + split_joke(row[0])
+            else:
+                yield reader.line_num, ",".join(row), row[0], row[1]
+
+
+def jsonl_jokes(path):
+    with open(path, "rb") as f:
+        for number, line in enumerate(f, 1):
+            line = line.decode("utf-8", errors="replace").strip()
+            if not line:
+                continue
+            try:
+                joke = json.loads(line)
+            except ValueError:
+                joke = None
+            if not isinstance(joke, dict):
+                yield number, line, "", ""
+            elif "joke" in joke:
+                yield (number, line) + split_joke(str(joke["joke"]))
+            else:
+                yield number, line, str(joke.get("setup") or "").strip(), str(joke.get("punchline") or "").strip()
+
+
+READERS = {".txt": text_jokes, ".csv": csv_jokes, ".jsonl": jsonl_jokes}
+
+
+# Writes a cache file through path.tmp so a half written one is never used.
+# write(out) fills it in. Gives back the finished file opened for reading.
+def write_cache(path, write):
+    try:
+        out = open(path + ".tmp", "w+b")
+    except OSError:
+        out = tempfile.TemporaryFile()  # read-only folder - the cache only lasts this run
+        write(out)
+        out.flush()
+        return out
+    write(out)
+    out.close()
+    os.replace(path + ".tmp", path)
+    return open(path, "rb")
+
+
+# Jokes are NOT all loaded anymore - a file can have millions of lines.
+# Every joke is split into (setup, punchline) once and saved in
+# <file>.cache, together with the size + modified time of the file it was
+# made from, so it's only rebuilt (and bad lines only reported) when that
+# file changes. The cache is mmap'd, so opening it costs the same whatever
+# the size, and clicking just reads two slices out of it. It also keeps a
+# hash of every joke so JokeCorpus can spot duplicates without re-reading.
+# Cache layout: header | all setups/punchlines as utf-8 | where each one ends | hashes
+# Source for mmap: https://docs.python.org/3/library/mmap.html
+class JokeCache:
+    HEADER = struct.Struct("<8sQQQQ")  # magic, file size, file mtime (ns), joke count, text size
+    MAGIC = b"JOKECAC2"
+
+    def __init__(self, path):
+        self.path = path
+        self.cache_path = path + ".cache"
+        stat = os.stat(path)
+        self.signature = (stat.st_size, stat.st_mtime_ns)
+        if self.cache_is_current(stat):
+            self.cache_file = open(self.cache_path, "rb")
+        else:
+            self.cache_file = write_cache(self.cache_path, lambda out: self.build(out, stat))
+        self.cache_map = mmap.mmap(self.cache_file.fileno(), 0, access=mmap.ACCESS_READ)
+        _, _, _, self.count, text_size = self.HEADER.unpack_from(self.cache_map)
+        ends_start = self.HEADER.size + text_size
+        hashes_start = ends_start + 8 * (2 * self.count + 1)
+        self.text = memoryview(self.cache_map)[self.HEADER.size:ends_start]
+        self.ends = memoryview(self.cache_map)[ends_start:hashes_start].cast("Q")
+        self.hashes = memoryview(self.cache_map)[hashes_start:].cast("Q")
+
+    def cache_is_current(self, stat):
+        try:
+            with open(self.cache_path, "rb") as f:
+                magic, size, mtime, _, _ = self.HEADER.unpack(f.read(self.HEADER.size))
+        except (OSError, struct.error):
+            return False
+        return magic == self.MAGIC and size == stat.st_size and mtime == stat.st_mtime_ns
+
+    def build(self, out, stat):
+        out.write(bytes(self.HEADER.size))  # filled in once the count is known
+        ends = array.array("Q", [0])
+        hashes = array.array("Q")
+        text_size = 0
+        read_jokes = READERS.get(os.path.splitext(self.path)[1].lower(), text_jokes)
+        for number, line, setup, punchline in read_jokes(self.path):
+            if not setup or not punchline:
+                print(f"Skipping malformed joke in {os.path.basename(self.path)} line {number}: {line}")
+                continue
+            setup, punchline = setup.encode("utf-8"), punchline.encode("utf-8")
+            out.write(setup)
+            out.write(punchline)
+            ends.append(text_size + len(setup))
+            text_size += len(setup) + len(punchline)
+            ends.append(text_size)
+            digest = hashlib.blake2b(setup + b"\0" + punchline, digest_size=8).digest()
+            hashes.append(int.from_bytes(digest, "little"))
+        padding = -text_size % ends.itemsize  # keep the tables aligned
+        out.write(bytes(padding))
+        ends.tofile(out)
+        hashes.tofile(out)
+        out.seek(0)
+        out.write(self.HEADER.pack(self.MAGIC, stat.st_size, stat.st_mtime_ns,
+                                   len(hashes), text_size + padding))
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        # (setup, punchline) - no splitting here, just two slices of the cache
+        start, middle, end = self.ends[2 * i], self.ends[2 * i + 1], self.ends[2 * i + 2]
+        return str(self.text[start:middle], "utf-8"), str(self.text[middle:end], "utf-8")
+
+    def close(self):
+        self.text.release()  # the mmap can't close while a view of it is alive
+        self.ends.release()
+        self.hashes.release()
+        self.cache_map.close()
+        self.cache_file.close()
+
+
+# All the joke files in one list, with every joke only once.
+# sources is a folder (every .txt/.csv/.jsonl in it) or a list of files and
+# folders. Each file has its own JokeCache, so only files that changed get
+# read again. The merged list is saved in jokes.index as (file, joke) pairs,
+# keyed on the name + size + modified time of every file, and is put back
+# together from the cached hashes when any of them changes - jokes that are
+# in more than one place are only kept the first time they show up.
+class JokeCorpus:
+    HEADER = struct.Struct("<8s16sQ")  # magic, hash of all the files' names/sizes/mtimes, joke count
+    MAGIC = b"JOKEIDX2"
+
+    def __init__(self, sources, index_path=None):
+        if isinstance(sources, str):
+            sources = [sources]
+        self.files = [JokeCache(path) for path in find_joke_files(sources)]
+        if index_path is None:
+            first = os.path.abspath(sources[0]) if sources else os.getcwd()
+            index_path = os.path.join(first if os.path.isdir(first) else os.path.dirname(first), "jokes.index")
+        self.path = index_path
+        key = hashlib.blake2b(repr([(f.path,) + f.signature for f in self.files]).encode("utf-8"),
+                              digest_size=16).digest()
+        if self.index_is_current(key):
+            self.index_file = open(self.path, "rb")
+        else:
+            self.index_file = write_cache(self.path, lambda out: self.build(out, key))
+        stat = os.fstat(self.index_file.fileno())
+        self.signature = (stat.st_size, stat.st_mtime_ns)  # JokeScheduler starts over when this changes
+        self.index_map = mmap.mmap(self.index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.count = self.HEADER.unpack_from(self.index_map)[2]
+        self.entries = memoryview(self.index_map)[self.HEADER.size:].cast("I")
+
+    def index_is_current(self, key):
+        try:
+            with open(self.path, "rb") as f:
+                magic, saved_key, _ = self.HEADER.unpack(f.read(self.HEADER.size))
+        except (OSError, struct.error):
+            return False
+        return magic == self.MAGIC and saved_key == key
+
+    def build(self, out, key):
+        seen = set()
+        entries = array.array("I")
+        for file_number, jokes in enumerate(self.files):
+            for joke_number, digest in enumerate(jokes.hashes):
+                if digest not in seen:
+                    seen.add(digest)
+                    entries.append(file_number)
+                    entries.append(joke_number)
+        out.write(self.HEADER.pack(self.MAGIC, key, len(entries) // 2))
+        entries.tofile(out)
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        return self.files[self.entries[2 * i]][self.entries[2 * i + 1]]
+
+    def close(self):
+        self.entries.release()
+        self.index_map.close()
+        self.index_file.close()
+        for jokes in self.files:
+            jokes.close()
+
+
+def find_joke_files(sources):
+    paths = []
+    for source in sources:
+        if os.path.isdir(source):
+            paths += sorted(os.path.join(source, name) for name in os.listdir(source)
+                            if os.path.splitext(name)[1].lower() in READERS)
+        else:
+            paths.append(source)
+    return paths
+
+
+# Hands out every joke once per round in a random order, so no repeats until
+# all of them have been told. It's Fisher-Yates done one step per click:
+# slots before the cursor are told, the rest are still to come, and each
+# click swaps a random remaining one into the cursor slot. The order and the
+# cursor live in jokes.index.order (mmap'd, written in place), so the round
+# carries on after a restart and memory stays at the index array.
+# weight(i) is optional: a number above 0 and up to 1 (1 = heaviest) that's
+# joke i's chance of being kept when it's drawn, so heavier jokes come up
+# earlier in each round. After MAX_TRIES unlucky draws in a row the last one
+# is kept anyway, so a click never takes more than MAX_TRIES tries.
+# main() doesn't use it - pass it in code, e.g. to favour short jokes:
+#     JokeScheduler(jokes, weight=lambda i: 1 / len(jokes[i][0]))
+# Source for Fisher-Yates: https://en.wikipedia.org/wiki/Fisher%E2%80%93Yates_shuffle
+class JokeScheduler:
+    HEADER = struct.Struct("<8sQQQQ")  # magic, joke list size, joke list mtime (ns), joke count, cursor
+    CURSOR = struct.Struct("<Q")
+    MAGIC = b"JOKEORD1"
+    MAX_TRIES = 32
+
+    def __init__(self, jokes, weight=None):
+        self.count = len(jokes)
+        self.weight = weight
+        self.order_path = jokes.path + ".order"
+        self.signature = (self.MAGIC,) + jokes.signature + (self.count,)
+        size = self.HEADER.size + 4 * self.count
+        try:
+            self.order_file = self.open_order()
+            self.order_map = mmap.mmap(self.order_file.fileno(), size)
+        except OSError:
+            self.order_file = None  # read-only folder - the order only lasts this run
+            self.order_map = mmap.mmap(-1, size)
+            self.fill(self.order_map)
+        self.cursor = self.HEADER.unpack_from(self.order_map)[4]
+        self.order = memoryview(self.order_map)[self.HEADER.size:].cast("I")
+        self.last_pick = None  # slot the last draw() swapped from, for undraw()
+
+    def open_order(self):
+        try:
+            f = open(self.order_path, "r+b")
+        except OSError:
+            pass
+        else:
+            try:
+                header = self.HEADER.unpack(f.read(self.HEADER.size))
+                if header[:4] == self.signature and header[4] <= self.count:
+                    return f
+            except struct.error:
+                pass
+            f.close()
+        f = open(self.order_path, "w+b")  # new or changed jokes - start a fresh round
+        self.fill(f)
+        f.flush()
+        return f
+
+    def fill(self, out):
+        out.write(self.HEADER.pack(*self.signature, 0))
+        for start in range(0, self.count, 1 << 16):
+            out.write(array.array("I", range(start, min(start + (1 << 16), self.count))).tobytes())
+
+    def draw(self):
+        if self.cursor == self.count:
+            self.cursor = 0  # everyone's been told once - start a new round
+        order, cursor = self.order, self.cursor
+        for _ in range(self.MAX_TRIES if self.weight else 1):
+            pick = random.randrange(cursor, self.count)
+            if self.weight is None or random.random() < self.joke_weight(order[pick]):
+                break
+        order[cursor], order[pick] = order[pick], order[cursor]
+        self.cursor += 1
+        self.last_pick = pick
+        self.save_cursor()
+        return order[cursor]
+
+    def joke_weight(self, i):
+        weight = self.weight(i)
+        if not 0 < weight <= 1:
+            raise ValueError(f"weight for joke {i} must be above 0 and at most 1, got {weight}")
+        return weight
+
+    def undraw(self, pick):
+        # takes back the latest draw that hasn't been taken back yet (pick is
+        # its last_pick), so a joke that was drawn but never shown is still
+        # to come. Undoing draws newest first puts the order back exactly.
+        if self.cursor == 0:
+            self.cursor = self.count  # that draw started a new round - go back to the old one
+        self.cursor -= 1
+        order = self.order
+        order[self.cursor], order[pick] = order[pick], order[self.cursor]
+        self.save_cursor()
+
+    def save_cursor(self):
+        self.CURSOR.pack_into(self.order_map, self.HEADER.size - self.CURSOR.size, self.cursor)
+
+    def close(self):
+        self.order.release()
+        if self.order_file is not None:
+            self.order_map.flush()
+        self.order_map.close()
+        if self.order_file is not None:
+            self.order_file.close()
+
+
+# Reading jokes.txt on a slow drive (like OneDrive) froze the window on a
+# click, so a background thread keeps the next few jokes ready in a queue
+# and tell_joke just takes one off the front. The thread is the only one
+# that touches the scheduler and the cache file while it runs. Jokes still
+# in the queue at stop() haven't been shown, so their draws are undone and
+# they're still to come in this round next time.
+# Source for queue + threads: https://docs.python.org/3/library/queue.html
+class JokePrefetcher:
+    def __init__(self, jokes, order, size=5):
+        self.jokes = jokes
+        self.order = order
+        self.buffer = queue.Queue(maxsize=size)
+        self.stopping = threading.Event()
+        self.thread = threading.Thread(target=self.fill, daemon=True)
+        self.thread.start()
+
+    def fill(self):
+        while not self.stopping.is_set():
+            joke = self.jokes[self.order.draw()]
+            pick = self.order.last_pick
+            while True:
+                if self.stopping.is_set():
+                    self.order.undraw(pick)  # drawn but never queued
+                    return
+                try:
+                    self.buffer.put((joke, pick), timeout=0.1)  # wakes up now and then to check for stop()
+                    break
+                except queue.Full:
+                    pass
+
+    def take(self):
+        # never waits - None means nothing is ready yet
+        try:
+            return self.buffer.get_nowait()[0]
+        except queue.Empty:
+            return None
+
+    def stop(self):
+        self.stopping.set()
+        self.thread.join()
+        unused = []
+        while not self.buffer.empty():
+            unused.append(self.buffer.get_nowait()[1])
+        for pick in reversed(unused):  # newest first
+            self.order.undraw(pick)
 
-# Load jokes from file
-with open(r"C:\Users\saeza\OneDrive\Desktop\A1 Advanced Programming\Exercise 2\jokes.txt", "r") as file:
-    jokes = [line.strip() for line in file if "?" in line]
 
 class JokeApp:
-    def __init__(self, root):
+    def __init__(self, root, jokes, prefetch):
         self.root = root
+        self.jokes = jokes
+        self.prefetch = prefetch
+        self.waiting = False
         self.root.title("Alexa's Joke Machine")
         self.root.geometry("500x350")
         self.root.config(bg="#FFD700")
@@ -43,19 +435,33 @@ class JokeApp:
                  bg="#DAA520", fg="white", width=14, command=self.quit_app).grid(row=0, column=2, padx=5)
     
     def tell_joke(self):
-        if not jokes:
+        if not self.jokes:
             messagebox.showerror("Error", "No jokes found!")
             return
-        self.current_joke = random.choice(jokes)
-        setup, punchline = self.current_joke.split("?", 1)
-        self.joke_label.config(text=setup + "?", font=("Arial", 15, "bold"))
+        joke = self.prefetch.take()
+        if joke is None:
+            # drive is slow and the buffer ran dry - try again shortly instead of freezing
+            self.current_joke = None
+            self.punchline_btn.grid_forget()
+            self.joke_label.config(text="Thinking of a good one...", font=("Arial", 13))
+            if not self.waiting:
+                self.waiting = True
+                self.root.after(50, self.retry_joke)
+            return
+        self.current_joke = joke
+        setup, punchline = self.current_joke
+        self.joke_label.config(text=setup, font=("Arial", 15, "bold"))
         self.showing_punchline = False
         self.punchline_btn.grid(row=0, column=1, padx=5)
         
+    def retry_joke(self):
+        self.waiting = False
+        self.tell_joke()
+
     def show_punchline(self):
         if self.current_joke and not self.showing_punchline:
-            setup, punchline = self.current_joke.split("?", 1)
-            self.joke_label.config(text=setup + "?\n\n" + punchline.strip(), font=("Arial", 13))
+            setup, punchline = self.current_joke
+            self.joke_label.config(text=setup + "\n\n" + punchline, font=("Arial", 13))
             self.showing_punchline = True
             self.punchline_btn.grid_forget()
     
@@ -64,12 +470,19 @@ class JokeApp:
             self.root.destroy()
 
 def main():
+    # python "Alexa tell me a Joke.py" [folder or joke files...]
+    jokes = JokeCorpus(sys.argv[1:] or [JOKES_PATH])
     if not jokes:
         print("I guess you wanna have a bad day..Exiting the program")
         return
+    order = JokeScheduler(jokes)
+    prefetch = JokePrefetcher(jokes, order)
     root = tk.Tk()
-    app = JokeApp(root)
+    app = JokeApp(root, jokes, prefetch)
     root.mainloop()
+    prefetch.stop()
+    order.close()
+    jokes.close()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,119 @@
+# -------------------------------------------------------------
+# JOKE MACHINE BENCHMARKS
+# Description:
+# Times how long a "Tell me a Joke" click takes to get a joke when the
+# jokes file is on a slow drive (like the OneDrive folder). Run it from the
+# Exercise2 folder:
+#     python benchmark.py
+# No window is opened - a click is timed as the work tell_joke does before
+# it can update the label. The slow drive is faked by sleeping on every
+# joke read. Everything is made in a temp folder, so the cache files don't
+# end up next to the real jokes.txt.
+# -------------------------------------------------------------
+# Sources/References:
+# - importlib (file name has spaces): https://docs.python.org/3/library/importlib.html
+# - time.perf_counter: https://docs.python.org/3/library/time.html#time.perf_counter
+# -------------------------------------------------------------
+import importlib.util
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+# -------------------------------------------------------------
+# Helper: import "Alexa tell me a Joke.py"
+# -------------------------------------------------------------
+def load_joke_module():
+    spec = importlib.util.spec_from_file_location(
+        "joke_machine", os.path.join(HERE, "Alexa tell me a Joke.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# -------------------------------------------------------------
+# Helper: a jokes file where every read takes `delay` seconds
+# -------------------------------------------------------------
+class SlowJokes:
+    def __init__(self, jokes, delay):
+        self.jokes = jokes
+        self.delay = delay
+        self.path = jokes.path
+        self.signature = jokes.signature
+
+    def __len__(self):
+        return len(self.jokes)
+
+    def __getitem__(self, i):
+        time.sleep(self.delay)
+        return self.jokes[i]
+
+
+def write_jokes(path, n):
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(n):
+            f.write(f"Why did joke {i} cross the road?To get to line {i + 1}.\n")
+
+
+def latency_row(label, times):
+    ms = sorted(t * 1000 for t in times)
+    p95 = ms[int(len(ms) * 0.95) - 1]
+    print(f"{label:>12} {statistics.mean(ms):>8.2f} {p95:>8.2f} {ms[-1]:>8.2f}")
+
+
+# -------------------------------------------------------------
+# Benchmark: click-to-display latency
+# "direct" = reading the joke inside the click like tell_joke used to,
+# "prefetch" = taking it from JokePrefetcher. If the buffer is empty the
+# app retries every 50 ms with root.after, so that's what is timed here.
+# `think` is the gap between clicks (someone reading the punchline).
+# -------------------------------------------------------------
+def bench_click_latency(module, delays=(0.0, 0.05, 0.2), clicks=30, think=0.25, n=100_000):
+    print(f"Click-to-joke latency, {clicks} clicks, {think * 1000:.0f} ms between clicks (milliseconds)")
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "jokes.txt")
+        write_jokes(path, n)
+        jokes = module.JokeCache(path)
+        for delay in delays:
+            print(f"simulated read delay {delay * 1000:.0f} ms")
+            print(f"{'':>12} {'mean':>8} {'p95':>8} {'max':>8}")
+            slow = SlowJokes(jokes, delay)
+
+            order = module.JokeScheduler(slow)
+            times = []
+            for _ in range(clicks):
+                start = time.perf_counter()
+                slow[order.draw()]
+                times.append(time.perf_counter() - start)
+                time.sleep(think)
+            order.close()
+            latency_row("direct", times)
+
+            order = module.JokeScheduler(slow)
+            prefetch = module.JokePrefetcher(slow, order)
+            time.sleep(think)  # the window is open a moment before the first click
+            times = []
+            for _ in range(clicks):
+                start = time.perf_counter()
+                while prefetch.take() is None:
+                    time.sleep(0.05)
+                times.append(time.perf_counter() - start)
+                time.sleep(think)
+            prefetch.stop()
+            order.close()
+            latency_row("prefetch", times)
+        jokes.close()
+
+
+def main():
+    module = load_joke_module()
+    clicks = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    bench_click_latency(module, clicks=clicks)
+
+
+if __name__ == "__main__":
+    main()
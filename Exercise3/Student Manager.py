@@ -14,98 +14,385 @@
 # honestly this took me forever to figure out but i got it working!!
 # the hardest part was making sure the file saves properly every time
 # -------------------------------------------------------------
+import argparse
+import gc
+import os
+import queue
+import sys
+import threading
+import time
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 
-class StudentManager:
+# all the data/file code lives in student_core.py (no tkinter in there),
+# so it can be used from scripts and the command line too
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from student_core import (StudentRoster, check_student, read_import_batches, timed,
+                          write_students_csv, LOAD_CHUNK, main as core_main)
+
+# compact the journal into database.txt once it has this many edits in it
+JOURNAL_LIMIT = 500
+# how often (ms) the window checks for finished file jobs, and how long (s)
+# it spends on them each time so a fast loader can't hog the main loop
+POLL_MS = 50
+POLL_BUDGET = 0.012
+# the loader hands rows to the window this many at a time - adding a row
+# also updates the ranking, stats and search, so 500 is a few ms of work
+DELIVER_ROWS = 500
+# edits made within this many ms of each other share one journal write
+COALESCE_MS = 100
+# rough height of one student card in pixels (card + padding), used to work
+# out how many cards fit in the display area for the virtual list
+CARD_HEIGHT = 225
+# most matches a student dropdown shows while you type
+MAX_MATCHES = 50
+
+
+# -------------------------------------------------------------
+# Class: FileWorker
+# Purpose: Do all the disk work on ONE background thread so the window
+# never freezes while a file is being read or written.
+# Jobs go in through a queue and run in the order they were sent. Their
+# results come back through a second queue that the Tk side checks with
+# root.after() - Tk widgets must only be touched from the main thread,
+# so callbacks (messageboxes etc.) always run there.
+# Source for queue: https://docs.python.org/3/library/queue.html
+# Source for threads + Tk: https://tkdocs.com/tutorial/eventloop.html#threads
+# -------------------------------------------------------------
+class FileWorker:
     def __init__(self, root):
+        self.root = root
+        self.jobs = queue.Queue()     # Tk thread -> worker
+        self.results = queue.Queue()  # worker -> Tk thread
+        self.submitted = 0  # jobs sent so far, so wait() can tell if callbacks sent more
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        self.poll()
+
+    def submit(self, work, on_done=None, on_error=None):
+        # work runs on the worker thread, on_done/on_error on the Tk thread
+        self.submitted += 1
+        self.jobs.put((work, on_done, on_error))
+
+    def deliver(self, callback, value):
+        # lets a long job send partial results back while it's still running
+        self.results.put((callback, value))
+
+    def run(self):
+        while True:
+            work, on_done, on_error = self.jobs.get()
+            try:
+                self.results.put((on_done, work()))
+            except Exception as e:
+                self.results.put((on_error, e))
+
+    def poll(self):
+        self.handle_results(POLL_BUDGET)
+        self.root.after(POLL_MS, self.poll)
+
+    def handle_results(self, budget=None):
+        # budget = seconds to spend here (None = until the queue is empty).
+        # At least one callback runs, so the queue always moves.
+        start = time.perf_counter()
+        while budget is None or time.perf_counter() - start < budget:
+            try:
+                callback, value = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if callback:
+                callback(value)
+
+    def wait(self):
+        # block until the worker is idle and every callback has run. Callbacks
+        # can send new jobs (an import's final save does), so keep going
+        # until a round of callbacks doesn't add any.
+        while True:
+            submitted = self.submitted
+            finished = threading.Event()
+            self.jobs.put((finished.set, None, None))
+            finished.wait()
+            self.handle_results()
+            if self.submitted == submitted:
+                break
+
+
+# -------------------------------------------------------------
+# Class: StudentManager
+# Purpose: The window. All the student data (list, index, grading,
+# files) comes from StudentRoster in student_core.py - this class adds
+# the widgets and does the file work on the FileWorker thread.
+# Source for inheritance: https://docs.python.org/3/tutorial/classes.html#inheritance
+# -------------------------------------------------------------
+class StudentManager(StudentRoster):
+    def __init__(self, root, dump_metrics=False, profile=False, file_path=None):
         """Initialize window, data list, and setup the UI.
         
         This is the constructor - runs when you create a StudentManager object.
         I set the file path here as a class variable so I can use it anywhere.
+        dump_metrics/profile come from the --metrics/--profile flags (see INSTRUMENTATION).
+        file_path opens a different database (the --db flag, or test files in benchmark.py).
         Source: https://docs.python.org/3/tutorial/classes.html#class-objects
         """
+        # storing file path as instance variable - the 'r' prefix means raw string
+        StudentRoster.__init__(self, file_path or r"C:\Users\saeza\OneDrive\Desktop\A1 Advanced Programming\Exercise 3\database.txt")
         self.root = root
         self.root.title("Student Manager - Extended")
         self.root.geometry("1000x750")
         self.root.configure(bg="#1D252D")  # dark mode theme
-        self.students = []  # list to store all student data as dictionaries
-        
-        # storing file path as instance variable - the 'r' prefix means raw string
-        self.file_path = r"C:\Users\saeza\OneDrive\Desktop\A1 Advanced Programming\Exercise 3\database.txt"
+        self.virtual_rows = None  # records shown in the virtual list (None = normal view)
+        self.first_row = 0  # index of the record shown in the top card
+        self.row_cards = []  # pooled cards - the virtual list and single cards reuse them
+        self.title_label = None  # pooled view widgets, made the first time they're needed
+        self.nav_bar = None
+        self.page_label = None  # "Showing 1-4 of N" in the nav bar
+        self.stats_panel = None  # (labels, grade badges, frame) for Class Statistics
+        self.stats_showing = False
+        self.pending_entries = []  # (journal line, on_done) waiting to be written together
+        self.count_label = None  # made in setup_ui, but the loader reports progress to it
+        self.closing = False  # set by on_close - stops a load that's still running
+        self.dump_metrics = dump_metrics
+        self.setup_metrics(profile)
         
+        self.worker = FileWorker(self.root)  # does all the file reading/writing
         self.load_students()
         self.setup_ui()
+        # write everything back to database.txt when the window is closed
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
     # -------------------------------------------------------------
     # Function: load_students
     # Purpose: Read student details from file and store in list
+    # The worker reads the file LOAD_CHUNK lines at a time and hands each
+    # chunk back, so the first records show up straight away and the window
+    # keeps responding while the rest loads. When it's done the journal is
+    # replayed so edits since the last compaction aren't lost.
     # Source for file handling: https://www.w3schools.com/python/python_file_handling.asp
     # -------------------------------------------------------------
     def load_students(self):
-        try:
-            with open(self.file_path, "r") as f:
-                lines = f.readlines()
-            
-            # Skip header line if it contains a number
-            if lines and lines[0].strip().isdigit():
-                lines = lines[1:]
-            
-            self.students = []
-            
-            for line in lines:
-                data = line.strip().split(',')  # split by comma
-                
-                if len(data) >= 6:
-                    # using dict instead of list - easier to access by name
-                    self.students.append({
-                        'id': data[0],
-                        'name': data[1],
-                        'course_marks': list(map(int, data[2:5])),  # convert to int
-                        'exam_mark': int(data[5])
-                    })
-        except FileNotFoundError:
-            messagebox.showerror("Error", "Database file not found.")
-        except Exception as e:
-            messagebox.showerror("Error", f"Could not read file: {e}")
+        self.reset()
+        self.loading = True
+        self.load_started = time.perf_counter()  # timed until finish_loading
+        # no garbage collection while the roster is loading - every collection
+        # would re-check all the records made so far and stall the window more
+        # as it grows. finish_loading turns it back on.
+        # Source: https://docs.python.org/3/library/gc.html#gc.disable
+        gc.disable()
+        
+        def work():  # runs on the worker thread
+            try:
+                self.open_store()
+                for chunk in self.read_student_chunks():
+                    if self.closing:
+                        break  # window is closing - don't read the rest of the file
+                    for start in range(0, len(chunk), DELIVER_ROWS):
+                        self.worker.deliver(self.add_chunk, chunk[start:start + DELIVER_ROWS])
+            except FileNotFoundError:
+                self.worker.deliver(self.show_load_error, "Database file not found.")
+            except Exception as e:
+                self.worker.deliver(self.show_load_error, f"Could not read file: {e}")
+            return self.read_journal()
+        
+        self.worker.submit(work, self.finish_loading, self.finish_loading_failed)
+
+    def add_chunk(self, chunk):
+        if self.closing:
+            return
+        self.add_students(chunk)
+        self.show_progress()
+
+    def show_load_error(self, message):
+        messagebox.showerror("Error", message)
+
+    def finish_loading(self, journal_entries):
+        # the records stay around until the app closes, so move them out of
+        # the collector's way ONCE before turning it back on - otherwise the
+        # first full collection re-checks the whole roster and stalls the window
+        # Source: https://docs.python.org/3/library/gc.html#gc.freeze
+        gc.freeze()
+        gc.enable()
+        if self.closing:
+            return  # only part of the file was read - stay "loading" so on_close doesn't save it
+        self.loading = False
+        self.replay_journal(journal_entries)
+        self.search.flush()  # build the search index now, not on the first keypress
+        self.metrics.record("load_students", time.perf_counter() - self.load_started)
+        if self.count_label:  # the UI exists (normal case - loading ends after setup_ui)
+            self.update_combo()
+            if self.virtual_rows is not None:
+                self.render_rows()
+
+    def finish_loading_failed(self, error):
+        messagebox.showerror("Error", f"Could not read journal: {error}")
+        self.finish_loading([])
+
+    def show_progress(self):
+        if not self.count_label:
+            return
+        if self.expected_count:
+            text = f"Loading students... {len(self.students):,} of {self.expected_count:,}"
+        else:
+            text = f"Loading students... {len(self.students):,}"
+        self.count_label.config(text=text)
+        if self.virtual_rows is not None:
+            self.render_rows()  # the list being viewed just got longer
 
     # -------------------------------------------------------------
     # Function: save_students
     # Purpose: Write all student data back to file
     # This is CRITICAL for persistence - without this changes are lost!
+    # StudentRoster.save does the actual writing (temp file + rename).
+    # Only used when closing - while the app runs compact_in_background
+    # does the same job on the worker.
     # Source: https://realpython.com/read-write-files-python/
     # -------------------------------------------------------------
+    @timed("save_students")
     def save_students(self):
         try:
-            with open(self.file_path, "w") as f:  # 'w' overwrites the file
-                f.write(f"{len(self.students)}\n")
-                
-                for s in self.students:
-                    marks = ','.join(map(str, s['course_marks']))
-                    f.write(f"{s['id']},{s['name']},{marks},{s['exam_mark']}\n")
-            
+            self.save()
             return True
         except Exception as e:
             messagebox.showerror("Error", f"Could not save to file: {e}")
             return False
 
     # -------------------------------------------------------------
-    # Function: calculate_results
-    # Purpose: Compute total, percentage, and grade for a student
+    # JOURNAL (write-ahead log)
+    # Every add/update/delete is appended as ONE short line:
+    #     A,id,name,cw1,cw2,cw3,exam   (add)
+    #     U,id,name,cw1,cw2,cw3,exam   (update)
+    #     D,id                         (delete)
+    # so an edit costs the same no matter how many students there are.
+    # database.txt is only rewritten when the journal gets long or on exit.
+    # Edits made close together (within COALESCE_MS) are written in one go.
+    # on_done runs once the edit is safely on disk.
     # -------------------------------------------------------------
-    def calculate_results(self, s):
-        total_coursework = sum(s['course_marks'])  # max 60
-        total = total_coursework + s['exam_mark']  # max 160
-        percent = (total / 160) * 100
-        
-        # loop through grade boundaries from highest to lowest
-        for limit, grade in [(70, 'A'), (60, 'B'), (50, 'C'), (40, 'D')]:
-            if percent >= limit:
-                break
+    def log_change(self, op, s, on_done=None):
+        if op == 'D':
+            entry = f"D,{s.id}\n"
         else:
-            grade = 'F'  # runs if we never hit break
+            entry = f"{op},{self.student_line(s)}\n"
+        
+        if self.store:  # SQLite: one small transaction on the worker instead
+            data = entry.rstrip("\n").split(',')
+            self.worker.submit(lambda: self.store.apply(data), lambda _: on_done and on_done(),
+                               lambda e: messagebox.showerror("Error", f"Could not save to file: {e}"))
+            return
         
-        return total_coursework, total, percent, grade
+        if not self.pending_entries:
+            self.root.after(COALESCE_MS, self.flush_journal)
+        self.pending_entries.append((entry, on_done))
+        
+        self.journal_count += 1
+        if self.journal_count >= JOURNAL_LIMIT:
+            self.compact_in_background()
+
+    def flush_journal(self):
+        batch, self.pending_entries = self.pending_entries, []
+        if not batch:
+            return
+        
+        def work():  # runs on the worker thread
+            with open(self.journal_path, "a") as f:  # 'a' adds to the end
+                f.write(''.join(entry for entry, _ in batch))
+                f.flush()
+                os.fsync(f.fileno())  # one fsync for the whole batch
+        
+        def done(_):
+            for _, on_done in batch:
+                if on_done:
+                    on_done()
+        
+        def failed(e):
+            messagebox.showerror("Error", f"Could not save to file: {e}")
+        
+        self.worker.submit(work, done, failed)
+
+    # -------------------------------------------------------------
+    # Compaction: fold the journal back into database.txt
+    # The journal is renamed to journal.old first so new edits go to a
+    # fresh journal while the big write happens. Both steps are worker
+    # jobs, so they can't get mixed up with journal writes.
+    # If anything goes wrong journal.old is still there and gets replayed.
+    # -------------------------------------------------------------
+    def compact_in_background(self, on_done=None, on_failed=None):
+        self.flush_journal()  # anything waiting must go into the journal first
+        self.journal_count = 0
+        lines = [self.student_line(s) for s in self.students]  # snapshot for the worker
+        
+        def work():
+            self.rotate_journal()
+            self.write_database(lines)
+        
+        def failed(e):
+            # database.txt is behind what's in memory (an import's rows were
+            # never journaled) - make sure on_close still saves
+            self.journal_count = max(self.journal_count, 1)
+            messagebox.showerror("Error", f"Background save failed: {e}")
+            if on_failed:
+                on_failed()
+        
+        self.worker.submit(work, on_done and (lambda _: on_done()), failed)
+
+    def on_close(self):
+        self.closing = True  # a running load stops after its current chunk
+        self.flush_journal()
+        self.worker.wait()  # finish queued writes (and an import's save) and show their messageboxes
+        if self.store:  # everything is already committed
+            self.store.close()
+            self.finish_metrics()
+            return self.root.destroy()
+        pending = self.journal_count or os.path.exists(self.journal_path + ".old")
+        if self.loading:
+            pending = False  # only part of the file is in memory - the journal keeps the edits
+        if pending and not self.save_students():
+            if not messagebox.askyesno("Quit", "Changes could not be saved.\nQuit anyway?"):
+                return
+        self.finish_metrics()
+        self.root.destroy()
+
+    # -------------------------------------------------------------
+    # INSTRUMENTATION
+    # Timings for the slow-when-big operations (load, save, view, sort,
+    # cards...) are always collected in self.metrics - it's cheap.
+    #   --metrics  writes them to database.txt.metrics.json on close
+    #   --profile  runs cProfile from start-up, saved to database.txt.prof
+    #   F9         starts/stops cProfile while the app is running
+    #   F10        writes the metrics file straight away
+    # Widgets are counted so it shows if a view starts making one per student.
+    # Source for <Destroy>: https://tkdocs.com/tutorial/eventloop.html
+    # -------------------------------------------------------------
+    def setup_metrics(self, profile):
+        self.metrics.widget_count = self.count_widgets
+        self.root.bind_all("<Destroy>", lambda e: self.metrics.count('widgets_destroyed'), add="+")
+        self.root.bind_all("<F9>", lambda e: self.toggle_profile())
+        self.root.bind_all("<F10>", lambda e: self.save_metrics(show=True))
+        if profile:
+            self.metrics.toggle_profile(self.file_path + ".prof")
+
+    def count_widgets(self, widget=None):
+        widget = widget or self.root
+        return 1 + sum(self.count_widgets(w) for w in widget.winfo_children())
+
+    def toggle_profile(self):
+        path = self.file_path + ".prof"
+        if self.metrics.toggle_profile(path):
+            messagebox.showinfo("Profiler", "Profiling started - press F9 again to stop.")
+        else:
+            messagebox.showinfo("Profiler", f"Profile saved to:\n{path}\n\nView it with: python -m pstats")
+
+    def save_metrics(self, show=False):
+        path = self.file_path + ".metrics.json"
+        try:
+            self.metrics.dump(path)
+        except OSError as e:
+            return messagebox.showerror("Error", f"Could not write metrics: {e}")
+        if show:
+            messagebox.showinfo("Metrics", f"Metrics saved to:\n{path}")
+
+    def finish_metrics(self):
+        if self.metrics.profiler:  # still profiling - save what we've got
+            self.metrics.toggle_profile(self.file_path + ".prof")
+        if self.dump_metrics:
+            self.save_metrics()
 
     # -------------------------------------------------------------
     # Function: create_button
@@ -150,6 +437,8 @@ class StudentManager:
         self.create_button(btns1, "Highest Score", self.show_highest, "#2B3643").pack(side="left", padx=3)
         self.create_button(btns1, "Lowest Score", self.show_lowest, "#2B3643").pack(side="left", padx=3)
         self.create_button(btns1, "Sort Records", self.sort_records, "#4A5C6B").pack(side="left", padx=3)
+        self.create_button(btns1, "Top 10", self.show_top_ten, "#4A5C6B").pack(side="left", padx=3)
+        self.create_button(btns1, "Class Statistics", self.show_statistics, "#4A5C6B").pack(side="left", padx=3)
 
         # --- BUTTONS ROW 2 (CRUD Operations) ---
         btns2 = tk.Frame(content, bg="#1D252D")
@@ -157,6 +446,8 @@ class StudentManager:
         self.create_button(btns2, "Add Student", self.add_student, "#2E7D32").pack(side="left", padx=3)
         self.create_button(btns2, "Update Student", self.update_student, "#1976D2").pack(side="left", padx=3)
         self.create_button(btns2, "Delete Student", self.delete_student, "#C62828").pack(side="left", padx=3)
+        self.create_button(btns2, "Import CSV", self.import_students, "#4A5C6B").pack(side="left", padx=3)
+        self.create_button(btns2, "Export CSV", self.export_students, "#4A5C6B").pack(side="left", padx=3)
 
         # --- DROPDOWN ROW ---
         select = tk.Frame(content, bg="#2B3643")
@@ -165,8 +456,7 @@ class StudentManager:
                  font=("Segoe UI", 11, "bold"), fg="white", bg="#2B3643").pack(side="left", padx=10)
 
         self.selected = tk.StringVar()
-        self.student_combo = ttk.Combobox(select, textvariable=self.selected,
-                                          state="readonly", width=35)
+        self.student_combo = self.make_search_combo(select, self.selected, 35)
         self.student_combo.pack(side="left", padx=10)
         self.update_combo()
         self.create_button(select, "View Record", self.view_individual, "#26AD5E").pack(side="left", padx=10)
@@ -175,25 +465,41 @@ class StudentManager:
         disp = tk.Frame(content, bg="#1D252D")
         disp.pack(fill="both", expand=True)
         self.canvas = tk.Canvas(disp, bg="#FFF", highlightthickness=0)
-        scrollbar = ttk.Scrollbar(disp, orient="vertical", command=self.canvas.yview)
+        self.scrollbar = ttk.Scrollbar(disp, orient="vertical", command=self.on_scrollbar)
         self.scroll_frame = tk.Frame(self.canvas, bg="#FFF")
 
         self.scroll_frame.bind("<Configure>", lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all")))
         self.canvas.create_window((0, 0), window=self.scroll_frame, anchor="nw")
-        self.canvas.configure(yscrollcommand=scrollbar.set)
+        self.canvas.configure(yscrollcommand=self.on_canvas_scroll)
+        self.canvas.bind("<Configure>", lambda e: self.virtual_rows is not None and self.render_rows())
         self.canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
+        self.scrollbar.pack(side="right", fill="y")
 
         # Enable mousewheel scroll
-        self.canvas.bind_all("<MouseWheel>", lambda e: self.canvas.yview_scroll(int(-e.delta / 120), "units"))
+        self.canvas.bind_all("<MouseWheel>", lambda e: self.on_scrollbar("scroll", int(-e.delta / 120), "units"))
+
+    # -------------------------------------------------------------
+    # Helper: make_search_combo
+    # A type-ahead dropdown - as you type it only lists the students that
+    # match (up to MAX_MATCHES) instead of the whole roster.
+    # Source for combobox events: https://tkdocs.com/tutorial/widgets.html#combobox
+    # -------------------------------------------------------------
+    def make_search_combo(self, parent, variable, width):
+        combo = ttk.Combobox(parent, textvariable=variable, width=width,
+                             values=self.search.search("", MAX_MATCHES))
+        combo.bind("<KeyRelease>", lambda e: combo.configure(
+            values=self.search.search(variable.get(), MAX_MATCHES)))
+        return combo
 
     # -------------------------------------------------------------
     # Helper: update combo box and count label
+    # self.search is already up to date, this just refreshes the matches shown
     # -------------------------------------------------------------
     def update_combo(self):
-        student_names = [f"{s['id']} - {s['name']}" for s in self.students]
-        self.student_combo['values'] = student_names
+        self.student_combo['values'] = self.search.search(self.selected.get(), MAX_MATCHES)
         self.count_label.config(text=f"Total Students: {len(self.students)}")
+        if self.stats_showing:
+            self.fill_statistics()  # dashboard is open - keep it current
 
     # -------------------------------------------------------------
     # Helper: get grade color for badge display
@@ -204,81 +510,278 @@ class StudentManager:
 
     # -------------------------------------------------------------
     # Helper: clear display area before new content
+    # Nothing is destroyed anymore - destroying and re-making hundreds of
+    # widgets on every view switch was what made the window lag. The
+    # widgets are just hidden here and the next view packs them again
+    # and changes their text/colour with config() (see WIDGET POOL).
     # -------------------------------------------------------------
     def clear_display(self):
         for w in self.scroll_frame.winfo_children():
-            w.destroy()
+            w.pack_forget()
+        self.virtual_rows = None  # back to normal canvas scrolling
+        self.stats_showing = False
 
     # -------------------------------------------------------------
-    # Function: show_card
-    # Purpose: Display a student's details (used for all views)
+    # WIDGET POOL
+    # The title, the Prev/Next bar, the cards and the statistics panel
+    # are each made the first time a view needs them and reused after
+    # that. clear_display unpacks everything, so the order a view packs
+    # them in is the order they show up on screen.
+    # Source for pack_forget: https://tkdocs.com/shipman/pack.html
     # -------------------------------------------------------------
-    def show_card(self, s, title):
-        if title:
-            self.clear_display()
-            tk.Label(self.scroll_frame, text=title, font=("Segoe UI", 16, "bold"),
-                     bg="#FFF").pack(pady=(20, 10), anchor="w", padx=30)
-        
-        c_total, total, percent, grade = self.calculate_results(s)
+    def show_title(self, text, padx):
+        if self.title_label is None:
+            self.title_label = tk.Label(self.scroll_frame, font=("Segoe UI", 16, "bold"), bg="#FFF")
+        self.title_label.config(text=text)
+        self.title_label.pack(pady=(20, 10), anchor="w", padx=padx)
+
+    def show_nav(self):
+        if self.nav_bar is None:
+            self.nav_bar = tk.Frame(self.scroll_frame, bg="#FFF")
+            tk.Button(self.nav_bar, text="< Prev", font=("Segoe UI", 10, "bold"), bg="#4A5C6B", fg="white",
+                      relief="flat", command=lambda: self.on_scrollbar("scroll", -1, "pages")).pack(side="left")
+            tk.Button(self.nav_bar, text="Next >", font=("Segoe UI", 10, "bold"), bg="#4A5C6B", fg="white",
+                      relief="flat", command=lambda: self.on_scrollbar("scroll", 1, "pages")).pack(side="left", padx=5)
+            self.page_label = tk.Label(self.nav_bar, font=("Segoe UI", 10), bg="#FFF")
+            self.page_label.pack(side="left", padx=10)
+        self.nav_bar.pack(fill="x", padx=30)
+
+    def card(self, i):
+        # the i-th pooled card - only made if the pool isn't that big yet
+        while len(self.row_cards) <= i:
+            self.row_cards.append(self.make_card())
+        return self.row_cards[i]
+
+    # -------------------------------------------------------------
+    # Helpers: make_card / fill_card
+    # make_card builds the empty widgets for one card, fill_card puts a
+    # student's details into them. Split up so the virtual list can
+    # build a card once and just refill it with another student.
+    # -------------------------------------------------------------
+    def make_card(self):
         card = tk.Frame(self.scroll_frame, bg="#F8F9FA", relief="solid", bd=1)
-        card.pack(fill="x", padx=30, pady=10)
+        labels = []
+        for _ in range(6):  # Name, Number, Coursework Total, Exam Mark, Overall %, Class Rank
+            lbl = tk.Label(card, font=("Segoe UI", 11), bg="#F8F9FA", anchor="w")
+            lbl.pack(anchor="w", pady=2, padx=10)
+            labels.append(lbl)
+
+        # Grade badge
+        badge = tk.Label(card, font=("Segoe UI", 13, "bold"), fg="white", width=10)
+        badge.pack(pady=10)
+        return card, labels, badge
+
+    def fill_card(self, widgets, s):
+        card, labels, badge = widgets
+        c_total, total, percent, grade = self.get_results(s)
 
         # Show student info
         details = [
-            ("Name", s['name']),
-            ("Number", s['id']),
+            ("Name", s.name),
+            ("Number", s.id),
             ("Coursework Total", f"{c_total}/60"),
-            ("Exam Mark", f"{s['exam_mark']}/100"),
-            ("Overall %", f"{percent:.2f}%")
+            ("Exam Mark", f"{s.exam_mark}/100"),
+            ("Overall %", f"{percent:.2f}%"),
+            ("Class Rank", f"{self.ranking.rank(s.id)} of {len(self.ranking)}")
         ]
-        for k, v in details:
-            tk.Label(card, text=f"{k}: {v}", font=("Segoe UI", 11),
-                     bg="#F8F9FA", anchor="w").pack(anchor="w", pady=2, padx=10)
+        for lbl, (k, v) in zip(labels, details):
+            lbl.config(text=f"{k}: {v}")
+        badge.config(text=f"Grade: {grade}", bg=self.color(grade))
 
-        # Grade badge
-        tk.Label(card, text=f"Grade: {grade}", font=("Segoe UI", 13, "bold"),
-                 bg=self.color(grade), fg="white", width=10).pack(pady=10)
+    # -------------------------------------------------------------
+    # Function: show_card
+    # Purpose: Display a student's details (used for single-record views)
+    # -------------------------------------------------------------
+    @timed("show_card")
+    def show_card(self, s, title):
+        if title:
+            self.clear_display()
+            self.show_title(title, 30)
+        
+        # the first card that isn't already showing (card 0 after clear_display)
+        shown = sum(1 for widgets in self.row_cards if widgets[0].winfo_manager())
+        widgets = self.card(shown)
+        widgets[0].pack(fill="x", padx=30, pady=10)
+        self.fill_card(widgets, s)
+
+    # -------------------------------------------------------------
+    # VIRTUAL LIST (used by View All and Sort)
+    # Making a Frame + 6 Labels for every student froze the window with a
+    # few thousand students. Instead we only build as many cards as fit in
+    # the canvas, and when you scroll we refill those same cards with the
+    # next students. The scrollbar is driven by hand (first_row / total)
+    # because the frame never actually holds the whole list.
+    # records only needs len() and [i], so it can be a lazy view
+    # (RankedView) that works out rows as they're shown.
+    # Prev/Next move one screenful (page) of cards at a time.
+    # Source (idea): https://tkdocs.com/tutorial/morewidgets.html#scrollbar
+    # -------------------------------------------------------------
+    def show_records(self, records, title):
+        self.clear_display()
+        self.show_title(title, 20)
+        self.show_nav()
+        self.virtual_rows = records
+        self.first_row = 0
+        self.canvas.yview_moveto(0)
+        self.render_rows()
+
+    def visible_row_count(self):
+        # +1 so a part-visible card at the bottom is filled in too
+        return max(1, self.canvas.winfo_height() // CARD_HEIGHT + 1)
+
+    @timed("render_rows")
+    def render_rows(self):
+        rows = self.virtual_rows
+        visible = self.visible_row_count()
+        # stop scrolling once the last card is on screen
+        self.first_row = max(0, min(self.first_row, len(rows) - visible + 1))
+
+        # only make new cards if the window got taller - never one per student
+        if rows:
+            self.card(min(visible, len(rows)) - 1)
+
+        for i, widgets in enumerate(self.row_cards):
+            pos = self.first_row + i
+            if i < visible and pos < len(rows):
+                self.fill_card(widgets, rows[pos])
+                if not widgets[0].winfo_manager():  # was hidden - show it again
+                    widgets[0].pack(fill="x", padx=30, pady=10)
+            else:
+                widgets[0].pack_forget()
+
+        if rows:
+            self.scrollbar.set(self.first_row / len(rows),
+                               min(1.0, (self.first_row + visible - 1) / len(rows)))
+        else:
+            self.scrollbar.set(0, 1)
+        last = min(self.first_row + visible, len(rows))
+        self.page_label.config(text=f"Showing {min(self.first_row + 1, last):,}-{last:,} of {len(rows):,}")
+
+    # -------------------------------------------------------------
+    # Scroll handlers - send scrolling to the canvas normally, or move
+    # first_row when the virtual list is showing.
+    # -------------------------------------------------------------
+    def on_scrollbar(self, *args):
+        if self.virtual_rows is None:
+            return self.canvas.yview(*args)
+        
+        total = len(self.virtual_rows)
+        if args[0] == "moveto":
+            self.first_row = int(float(args[1]) * total)
+        elif args[0] == "scroll":
+            step = int(args[1])
+            if args[2] == "pages":
+                step *= max(1, self.visible_row_count() - 1)
+            self.first_row += step
+        self.render_rows()
+
+    def on_canvas_scroll(self, first, last):
+        if self.virtual_rows is None:  # virtual list sets the scrollbar itself
+            self.scrollbar.set(first, last)
 
     # -------------------------------------------------------------
     # View Functions
     # -------------------------------------------------------------
+    @timed("view_all")
     def view_all(self):
         """Display all students in scrollable list."""
         self.clear_display()
         if not self.students:
             return messagebox.showinfo("No Data", "No student records found.")
-        tk.Label(self.scroll_frame, text="All Student Records",
-                 font=("Segoe UI", 16, "bold"), bg="#FFF").pack(pady=(20, 10), anchor="w", padx=20)
-        for s in self.students:
-            self.show_card(s, "")
+        self.show_records(self.students, "All Student Records")
 
     def view_individual(self):
         """Display the selected student's record."""
         if not self.selected.get():
             return messagebox.showwarning("Select", "Please select a student.")
-        sid = self.selected.get().split(" - ")[0]
-        s = next((x for x in self.students if x['id'] == sid), None)
+        s = self.student_from_choice(self.selected.get())
         if s:
             self.show_card(s, "Individual Student Record")
+        else:
+            messagebox.showwarning("Select", "No student matches that - pick one from the list.")
 
     def show_highest(self):
         """Find and display the highest-scoring student."""
         if not self.students:
             return messagebox.showinfo("No Data", "No student records found.")
-        self.show_card(max(self.students, key=lambda s: self.calculate_results(s)[2]),
-                       "Highest Scoring Student")
+        self.show_card(self.highest_student(), "Highest Scoring Student")
 
     def show_lowest(self):
         """Find and display the lowest-scoring student."""
         if not self.students:
             return messagebox.showinfo("No Data", "No student records found.")
-        self.show_card(min(self.students, key=lambda s: self.calculate_results(s)[2]),
-                       "Lowest Scoring Student")
+        self.show_card(self.lowest_student(), "Lowest Scoring Student")
+
+    def show_top_ten(self):
+        """Display the ten highest-scoring students, best first."""
+        if not self.students:
+            return messagebox.showinfo("No Data", "No student records found.")
+        self.show_records(self.ranking.top(10), "Top 10 Students")
+
+    # -------------------------------------------------------------
+    # EXTENSION: Class Statistics dashboard
+    # Everything comes from self.stats (ClassStats in student_core.py),
+    # which is updated on every add/update/delete - so this is instant
+    # even with a million students and never loops over the roster.
+    # -------------------------------------------------------------
+    @timed("show_statistics")
+    def show_statistics(self):
+        """Display class-wide statistics."""
+        if not self.students:
+            return messagebox.showinfo("No Data", "No student records found.")
+        self.clear_display()
+        self.show_title("Class Statistics", 30)
+        if self.stats_panel is None:
+            self.stats_panel = self.make_stats_panel()
+        self.stats_panel[2].pack(fill="x", padx=30, pady=10)
+        self.stats_showing = True
+        self.fill_statistics()
+
+    def make_stats_panel(self):
+        card = tk.Frame(self.scroll_frame, bg="#F8F9FA", relief="solid", bd=1)
+        labels = []
+        for _ in range(8):  # Students, Mean, Median, Std Dev, CW1-3 averages, Exam average
+            lbl = tk.Label(card, font=("Segoe UI", 11), bg="#F8F9FA", anchor="w")
+            lbl.pack(anchor="w", pady=2, padx=10)
+            labels.append(lbl)
+        
+        # one coloured badge per grade, in a row
+        badges = tk.Frame(card, bg="#F8F9FA")
+        badges.pack(pady=10)
+        grade_badges = {}
+        for grade in 'ABCDF':
+            grade_badges[grade] = tk.Label(badges, font=("Segoe UI", 11, "bold"), fg="white",
+                                           bg=self.color(grade), width=14)
+            grade_badges[grade].pack(side="left", padx=4)
+        return labels, grade_badges, card
+
+    def fill_statistics(self):
+        labels, grade_badges, _ = self.stats_panel
+        stats = self.stats
+        cw1, cw2, cw3, exam = stats.mark_averages()
+        details = [
+            ("Students", f"{stats.count:,}"),
+            ("Mean", f"{stats.mean():.2f}%"),
+            ("Median", f"{stats.median():.2f}%"),
+            ("Std Dev", f"{stats.stddev():.2f}%"),
+            ("Coursework 1 Average", f"{cw1:.2f}/20"),
+            ("Coursework 2 Average", f"{cw2:.2f}/20"),
+            ("Coursework 3 Average", f"{cw3:.2f}/20"),
+            ("Exam Average", f"{exam:.2f}/100")
+        ]
+        for lbl, (k, v) in zip(labels, details):
+            lbl.config(text=f"{k}: {v}")
+        
+        for grade, n in stats.grade_counts().items():
+            share = n / stats.count * 100 if stats.count else 0
+            grade_badges[grade].config(text=f"{grade}: {n:,} ({share:.1f}%)")
 
     # -------------------------------------------------------------
     # EXTENSION: Sort Records
     # This was pretty easy once I figured out lambda functions.
     # key parameter tells sort() what to sort by - lambda returns the percentage.
+    # Now it shows a sorted VIEW instead of sorting self.students, so the
+    # saved file keeps its order and only the cards on screen get worked out.
     # Source for sort with key: https://docs.python.org/3/howto/sorting.html
     # -------------------------------------------------------------
     def sort_records(self):
@@ -296,17 +799,13 @@ class StudentManager:
                  fg="white", bg="#2B3643").pack(pady=20)
         
         def sort_and_display(reverse):
-            # THE MAGIC LINE - sorts by percentage
-            self.students.sort(key=lambda s: self.calculate_results(s)[2], reverse=reverse)
-            sort_window.destroy()
-            self.clear_display()
-            
-            order = "Descending" if reverse else "Ascending"
-            tk.Label(self.scroll_frame, text=f"Sorted Records ({order} Order)",
-                     font=("Segoe UI", 16, "bold"), bg="#FFF").pack(pady=(20, 10), anchor="w", padx=20)
-            
-            for s in self.students:
-                self.show_card(s, "")
+            with self.metrics.timer("sort_records"):
+                # THE MAGIC LINE - sorted by percentage (lazily)
+                records = self.sorted_records(reverse)
+                sort_window.destroy()
+                
+                order = "Descending" if reverse else "Ascending"
+                self.show_records(records, f"Sorted Records ({order} Order)")
         
         btn_frame = tk.Frame(sort_window, bg="#2B3643")
         btn_frame.pack(pady=10)
@@ -326,6 +825,8 @@ class StudentManager:
     # -------------------------------------------------------------
     def add_student(self):
         """Add a new student record."""
+        if self.loading or self.busy:
+            return messagebox.showinfo("Please wait", "Still reading/writing students - please wait a moment.")
         add_window = tk.Toplevel(self.root)
         add_window.title("Add New Student")
         add_window.geometry("500x450")
@@ -352,43 +853,33 @@ class StudentManager:
             fields[key] = entry
         
         def save_new_student():
-            try:
-                student_id = fields['id'].get().strip()
-                name = fields['name'].get().strip()
-                
-                if not student_id or not name:
-                    return messagebox.showerror("Error", "ID and Name are required!")
-                
-                # Check if ID already exists
-                if any(s['id'] == student_id for s in self.students):
-                    return messagebox.showerror("Error", "Student ID already exists!")
-                
-                cw1 = int(fields['cw1'].get())
-                cw2 = int(fields['cw2'].get())
-                cw3 = int(fields['cw3'].get())
-                exam = int(fields['exam'].get())
-                
-                # Validate mark ranges
-                if not (0 <= cw1 <= 20 and 0 <= cw2 <= 20 and 0 <= cw3 <= 20):
-                    return messagebox.showerror("Error", "Coursework marks must be between 0 and 20!")
-                if not (0 <= exam <= 100):
-                    return messagebox.showerror("Error", "Exam mark must be between 0 and 100!")
-                
-                # Add student
-                self.students.append({
-                    'id': student_id,
-                    'name': name,
-                    'course_marks': [cw1, cw2, cw3],
-                    'exam_mark': exam
-                })
-                
-                if self.save_students():
-                    messagebox.showinfo("Success", "Student added successfully!")
-                    self.update_combo()
-                    add_window.destroy()
-                    
-            except ValueError:
-                messagebox.showerror("Error", "Please enter valid numbers for marks!")
+            student_id = fields['id'].get().strip()
+            name = fields['name'].get().strip()
+            
+            if not student_id or not name:
+                return messagebox.showerror("Error", "ID and Name are required!")
+            
+            # Check if ID already exists
+            if student_id in self.index:
+                return messagebox.showerror("Error", "Student ID already exists!")
+            
+            # number and range checks are shared with bulk import
+            student, error = check_student(student_id, name,
+                                           [fields[k].get() for k in ('cw1', 'cw2', 'cw3', 'exam')])
+            error = error or self.check_fits(student_id, name)
+            if error:
+                return messagebox.showerror("Error", error)
+            
+            # Add student
+            self.insert_student(student)
+            
+            def saved():
+                messagebox.showinfo("Success", "Student added successfully!")
+                self.update_combo()
+                add_window.destroy()
+            
+            # saving happens on the worker - saved() runs once it's on disk
+            self.log_change('A', student, saved)
         
         tk.Button(add_window, text="Save Student", font=("Segoe UI", 12, "bold"),
                   bg="#26AD5E", fg="white", width=20, height=2,
@@ -397,11 +888,12 @@ class StudentManager:
     # -------------------------------------------------------------
     # EXTENSION: Delete Student
     # Simpler than add/update but I added confirmation because deleting is permanent!
-    # Using next() with generator - stops as soon as it finds a match (more efficient).
-    # Source for next(): https://www.w3schools.com/python/ref_func_next.asp
+    # Uses find_student() which looks the ID up in self.index (no scanning).
     # -------------------------------------------------------------
     def delete_student(self):
         """Delete a student record."""
+        if self.loading or self.busy:
+            return messagebox.showinfo("Please wait", "Still reading/writing students - please wait a moment.")
         if not self.students:
             return messagebox.showinfo("No Data", "No student records found.")
         
@@ -418,29 +910,29 @@ class StudentManager:
                  fg="white", bg="#2B3643").pack(pady=10)
         
         selected_student = tk.StringVar()
-        student_list = [f"{s['id']} - {s['name']}" for s in self.students]
-        combo = ttk.Combobox(delete_window, textvariable=selected_student,
-                            values=student_list, state="readonly", width=40)
+        combo = self.make_search_combo(delete_window, selected_student, 40)
         combo.pack(pady=10)
         
         def confirm_delete():
             if not selected_student.get():
                 return messagebox.showwarning("Select", "Please select a student to delete.")
             
-            sid = selected_student.get().split(" - ")[0]
-            student = next((s for s in self.students if s['id'] == sid), None)
+            student = self.student_from_choice(selected_student.get())
             
             if student:
                 # Ask for confirmation before deleting
                 confirm = messagebox.askyesno("Confirm Delete",
-                                             f"Are you sure you want to delete:\n{student['name']} ({student['id']})?")
+                                             f"Are you sure you want to delete:\n{student.name} ({student.id})?")
                 if confirm:
-                    self.students.remove(student)
-                    if self.save_students():
+                    self.remove_student(student)
+                    
+                    def deleted():
                         messagebox.showinfo("Success", "Student deleted successfully!")
                         self.update_combo()
                         delete_window.destroy()
                         self.clear_display()
+                    
+                    self.log_change('D', student, deleted)
         
         tk.Button(delete_window, text="Delete Student", font=("Segoe UI", 12, "bold"),
                   bg="#C62828", fg="white", width=20, height=2,
@@ -455,6 +947,8 @@ class StudentManager:
     # -------------------------------------------------------------
     def update_student(self):
         """Update an existing student record."""
+        if self.loading or self.busy:
+            return messagebox.showinfo("Please wait", "Still reading/writing students - please wait a moment.")
         if not self.students:
             return messagebox.showinfo("No Data", "No student records found.")
         
@@ -471,9 +965,7 @@ class StudentManager:
                  fg="white", bg="#2B3643").pack(pady=5)
         
         selected_student = tk.StringVar()
-        student_list = [f"{s['id']} - {s['name']}" for s in self.students]
-        combo = ttk.Combobox(update_window, textvariable=selected_student,
-                            values=student_list, state="readonly", width=40)
+        combo = self.make_search_combo(update_window, selected_student, 40)
         combo.pack(pady=5)
         
         form = tk.Frame(update_window, bg="#2B3643")
@@ -494,25 +986,24 @@ class StudentManager:
         # Auto-load data when student is selected
         def load_student_data(*args):
             if selected_student.get():
-                sid = selected_student.get().split(" - ")[0]
-                student = next((s for s in self.students if s['id'] == sid), None)
+                student = self.student_from_choice(selected_student.get())
                 
                 if student:
                     # Clear and insert new data for each field
                     fields['name'].delete(0, tk.END)
-                    fields['name'].insert(0, student['name'])
+                    fields['name'].insert(0, student.name)
                     
                     fields['cw1'].delete(0, tk.END)
-                    fields['cw1'].insert(0, student['course_marks'][0])
+                    fields['cw1'].insert(0, student.course_marks[0])
                     
                     fields['cw2'].delete(0, tk.END)
-                    fields['cw2'].insert(0, student['course_marks'][1])
+                    fields['cw2'].insert(0, student.course_marks[1])
                     
                     fields['cw3'].delete(0, tk.END)
-                    fields['cw3'].insert(0, student['course_marks'][2])
+                    fields['cw3'].insert(0, student.course_marks[2])
                     
                     fields['exam'].delete(0, tk.END)
-                    fields['exam'].insert(0, student['exam_mark'])
+                    fields['exam'].insert(0, student.exam_mark)
         
         # trace watches the StringVar for changes
         selected_student.trace('w', load_student_data)
@@ -521,49 +1012,151 @@ class StudentManager:
             if not selected_student.get():
                 return messagebox.showwarning("Select", "Please select a student.")
             
-            try:
-                sid = selected_student.get().split(" - ")[0]
-                student = next((s for s in self.students if s['id'] == sid), None)
+            student = self.student_from_choice(selected_student.get())
+            
+            if student:
+                name = fields['name'].get().strip()
+                if not name:
+                    return messagebox.showerror("Error", "Name cannot be empty!")
                 
-                if student:
-                    name = fields['name'].get().strip()
-                    if not name:
-                        return messagebox.showerror("Error", "Name cannot be empty!")
-                    
-                    cw1 = int(fields['cw1'].get())
-                    cw2 = int(fields['cw2'].get())
-                    cw3 = int(fields['cw3'].get())
-                    exam = int(fields['exam'].get())
-                    
-                    if not (0 <= cw1 <= 20 and 0 <= cw2 <= 20 and 0 <= cw3 <= 20):
-                        return messagebox.showerror("Error", "Coursework marks must be between 0 and 20!")
-                    if not (0 <= exam <= 100):
-                        return messagebox.showerror("Error", "Exam mark must be between 0 and 100!")
-                    
-                    # Update the dictionary directly
-                    student['name'] = name
-                    student['course_marks'] = [cw1, cw2, cw3]
-                    student['exam_mark'] = exam
-                    
-                    if self.save_students():
-                        messagebox.showinfo("Success", "Student updated successfully!")
-                        self.update_combo()
-                        update_window.destroy()
-                        
-            except ValueError:
-                messagebox.showerror("Error", "Please enter valid numbers for marks!")
+                checked, error = check_student(student.id, name,
+                                               [fields[k].get() for k in ('cw1', 'cw2', 'cw3', 'exam')])
+                error = error or self.check_fits(student.id, name)
+                if error:
+                    return messagebox.showerror("Error", error)
+                
+                # Update the Student object directly
+                self.change_student(student, name, checked.course_marks, checked.exam_mark)
+                
+                def updated():
+                    messagebox.showinfo("Success", "Student updated successfully!")
+                    self.update_combo()
+                    update_window.destroy()
+                
+                self.log_change('U', student, updated)
         
         tk.Button(update_window, text="Save Changes", font=("Segoe UI", 12, "bold"),
                   bg="#1976D2", fg="white", width=20, height=2,
                   command=save_updates).pack(pady=15)
 
+    # -------------------------------------------------------------
+    # EXTENSION: Bulk Import / Export
+    # Import streams the file on the worker and checks it in batches with
+    # the same rules as Add Student. Good rows go straight in, bad rows
+    # (and duplicate IDs) go to <file>.errors.txt, and everything is saved
+    # with ONE write at the end instead of one journal line per student.
+    # Source for filedialog: https://docs.python.org/3/library/dialog.html
+    # -------------------------------------------------------------
+    def import_students(self):
+        """Add many students at once from a CSV file."""
+        if self.loading or self.busy:
+            return messagebox.showinfo("Please wait", "Still reading/writing students - please wait a moment.")
+        path = filedialog.askopenfilename(title="Import Students",
+                                          filetypes=[("CSV files", "*.csv *.txt"), ("All files", "*.*")])
+        if not path:
+            return
+        
+        self.busy = True  # no edits while importing, so duplicate checks stay right
+        self.imported = []
+        self.import_errors = []
+        
+        def work():  # runs on the worker thread
+            for batch in read_import_batches(path, LOAD_CHUNK):
+                self.worker.deliver(self.add_import_batch, batch)
+            return path
+        
+        def failed(e):
+            messagebox.showerror("Error", f"Could not read file: {e}")
+            self.finish_import(path)  # still save the rows that made it in
+        
+        self.worker.submit(work, self.finish_import, failed)
+
+    def add_import_batch(self, batch):
+        self.import_batch(batch, self.imported, self.import_errors)
+        if self.count_label:
+            self.count_label.config(text=f"Importing students... {len(self.imported):,} added, "
+                                         f"{len(self.import_errors):,} rejected")
+
+    def finish_import(self, path):
+        imported, errors = self.imported, self.import_errors
+        report = path + ".errors.txt"
+        
+        def done():
+            self.busy = False
+            self.update_combo()
+            message = f"Imported {len(imported):,} students."
+            if errors:
+                message += f"\n{len(errors):,} rows were rejected - see:\n{report}"
+            messagebox.showinfo("Import", message)
+        
+        def write_report():
+            with open(report, "w") as f:
+                f.writelines(errors)
+        
+        def unlock():
+            self.busy = False
+            self.update_combo()
+        
+        def failed(e):
+            self.busy = False
+            messagebox.showerror("Error", f"Could not save to file: {e}")
+        
+        if errors:
+            self.worker.submit(write_report, None, failed)
+        if self.store:
+            self.worker.submit(lambda: self.store.insert_many(imported), lambda _: done(), failed)
+        elif imported:
+            self.compact_in_background(done, unlock)  # one atomic rewrite of the database
+        else:
+            done()
+
+    def export_students(self):
+        """Write every student out to a CSV file."""
+        if self.loading or self.busy:
+            return messagebox.showinfo("Please wait", "Still reading/writing students - please wait a moment.")
+        path = filedialog.asksaveasfilename(title="Export Students", defaultextension=".csv",
+                                            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")])
+        if not path:
+            return
+        
+        self.busy = True  # the worker reads self.students, so no edits until it's done
+        self.count_label.config(text="Exporting students...")
+        
+        def done(count):
+            self.busy = False
+            self.update_combo()
+            messagebox.showinfo("Export", f"Exported {count:,} students to:\n{path}")
+        
+        def failed(e):
+            self.busy = False
+            self.update_combo()
+            messagebox.showerror("Error", f"Could not save to file: {e}")
+        
+        self.worker.submit(lambda: write_students_csv(path, self.students), done, failed)
+
 # -------------------------------------------------------------
 # PROGRAM ENTRY POINT
 # This only runs if you execute this file directly.
 # tk.Tk() creates the main window, mainloop() keeps it running.
+# Timings: --metrics and/or --profile (see INSTRUMENTATION in StudentManager)
+# A different database: --db PATH - the ending picks how it's stored:
+#     python "Student Manager.py" --db database.db    (SQLite, copies database.txt in the first time)
+#     python "Student Manager.py" --db database.bin   (fixed-width binary)
+# Batch grading/sorting/reports without a window: see student_core.py
+# The database can also be converted without opening the window:
+#     python "Student Manager.py" --to-binary database.txt database.bin
+#     python "Student Manager.py" --to-csv database.bin database.txt
 # Source: https://realpython.com/python-gui-tkinter/
 # -------------------------------------------------------------
 if __name__ == "__main__":
-    root = tk.Tk()
-    StudentManager(root)
-    root.mainloop()
+    if len(sys.argv) == 4 and sys.argv[1] in ("--to-binary", "--to-csv"):
+        core_main([sys.argv[1][2:]] + sys.argv[2:])  # same as: python student_core.py to-binary ...
+    else:
+        parser = argparse.ArgumentParser(description="Student Manager")
+        parser.add_argument("--db", help="database to open (.txt, .bin or .db) instead of database.txt")
+        parser.add_argument("--metrics", action="store_true", help="write timings to <database>.metrics.json on close")
+        parser.add_argument("--profile", action="store_true", help="run cProfile from start-up")
+        args = parser.parse_args()
+        root = tk.Tk()
+        StudentManager(root, dump_metrics=args.metrics, profile=args.profile, file_path=args.db)
+        root.mainloop()
@@ -0,0 +1,500 @@
+# -------------------------------------------------------------
+# STUDENT MANAGER BENCHMARKS
+# Description:
+# Small timing scripts for the parts of Student Manager that get slow
+# when the roster is big. Run it from the Exercise3 folder:
+#     python benchmark.py
+# No window is opened - the benchmarks use StudentRoster from
+# student_core.py, which is the data side of StudentManager.
+#
+# There's also a repeatable suite that writes JSON, for tracking
+# speed + memory between changes (see SUITE below):
+#     python benchmark.py suite --sizes 1000,100000,1000000 --out before.json
+#     python benchmark.py suite --sizes 1000,100000,1000000 --compare before.json
+# -------------------------------------------------------------
+# Sources/References:
+# - timeit: https://docs.python.org/3/library/timeit.html
+# - importlib (file name has a space): https://docs.python.org/3/library/importlib.html
+# - subprocess: https://docs.python.org/3/library/subprocess.html
+# - tracemalloc: https://docs.python.org/3/library/tracemalloc.html
+# -------------------------------------------------------------
+import argparse
+import gc
+import importlib.util
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+import student_core
+
+
+# -------------------------------------------------------------
+# Helper: import "Student Manager.py"
+# A normal import doesn't work because of the space in the name.
+# -------------------------------------------------------------
+def load_manager_module():
+    spec = importlib.util.spec_from_file_location(
+        "student_manager", os.path.join(HERE, "Student Manager.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# -------------------------------------------------------------
+# Helper: make a list of fake students in the same shape as load_students
+# -------------------------------------------------------------
+def make_students(n, seed=1):
+    rng = random.Random(seed)
+    return [student_core.Student(str(100000 + i), f"Student {i}",
+                                 [rng.randint(0, 20) for _ in range(3)], rng.randint(0, 100))
+            for i in range(n)]
+
+
+def make_manager(module, students):
+    mgr = module.StudentRoster("database.txt")
+    mgr.students = students
+    mgr.rebuild_index()
+    return mgr
+
+
+# -------------------------------------------------------------
+# Benchmark: lookup by ID
+# Compares the old next() scan with the dict index. The index
+# time should stay flat while the scan grows with the roster.
+# -------------------------------------------------------------
+def bench_lookup(module, sizes=(1_000, 10_000, 100_000, 1_000_000), lookups=200):
+    print("Lookup by ID (microseconds per lookup)")
+    print(f"{'students':>10} {'linear scan':>14} {'index':>10}")
+    for n in sizes:
+        mgr = make_manager(module, make_students(n))
+        rng = random.Random(n)
+        ids = [str(100000 + rng.randrange(n)) for _ in range(lookups)]
+
+        def scan():
+            for sid in ids:
+                next((s for s in mgr.students if s.id == sid), None)
+
+        def indexed():
+            for sid in ids:
+                mgr.find_student(sid)
+
+        # the scan is slow on big rosters so only run it once
+        scan_us = timeit.timeit(scan, number=1) / lookups * 1e6
+        index_us = min(timeit.repeat(indexed, number=100, repeat=3)) / (100 * lookups) * 1e6
+        print(f"{n:>10} {scan_us:>14.2f} {index_us:>10.3f}")
+
+
+# -------------------------------------------------------------
+# Benchmark: object list vs columnar (NumPy) grading and sorting
+# Times grading everyone (what the grade/report commands do) and a sorted
+# copy of the roster (what sort_students does), starting with no results
+# cached on the records. "build" is turning the Student objects into
+# arrays, which the columnar side pays once per change to the roster.
+# -------------------------------------------------------------
+def bench_columnar(module, sizes=(10_000, 100_000, 1_000_000)):
+    if module.load_numpy() is None:
+        print("Columnar benchmark skipped - NumPy is not installed")
+        return
+    print("Grading every student, then a sorted copy of the roster (seconds)")
+    print(f"{'students':>10} {'list grade':>11} {'col grade':>10} {'list sort':>10} {'col sort':>9} {'build':>8}")
+    for n in sizes:
+        students = make_students(n)
+        mgr = make_manager(module, students)
+
+        def forget():
+            for s in students:
+                s.results = None
+
+        def list_grade():
+            for s in students:
+                mgr.get_results(s)
+
+        def list_sort():
+            sorted(students, key=lambda s: mgr.get_results(s)[2])
+
+        def build():
+            return module.ColumnarStudents.from_students(students)
+
+        cols = build()
+
+        def columnar_grade():
+            # totals, percents and grades for everyone, from the arrays
+            module.ColumnarStudents(cols.coursework, cols.exam)
+
+        def columnar_sort():
+            [students[i] for i in cols.argsort()]
+
+        grade_s = min(timeit.repeat(list_grade, setup=forget, number=1, repeat=3))
+        col_grade_s = min(timeit.repeat(columnar_grade, number=1, repeat=3))
+        sort_s = min(timeit.repeat(list_sort, setup=forget, number=1, repeat=3))
+        col_sort_s = min(timeit.repeat(columnar_sort, number=1, repeat=3))
+        build_s = min(timeit.repeat(build, number=1, repeat=3))
+        print(f"{n:>10} {grade_s:>11.3f} {col_grade_s:>10.4f} {sort_s:>10.3f} {col_sort_s:>9.4f} {build_s:>8.3f}")
+
+
+# -------------------------------------------------------------
+# Helper: write students to a database.txt style file
+# -------------------------------------------------------------
+def write_csv(path, students):
+    with open(path, "w") as f:
+        f.write(f"{len(students)}\n")
+        for s in students:
+            marks = ','.join(map(str, s.course_marks))
+            f.write(f"{s.id},{s.name},{marks},{s.exam_mark}\n")
+
+
+# -------------------------------------------------------------
+# Benchmark: cold-start load, CSV vs binary (mmap)
+# "first page" = open the file and get the first LOAD_CHUNK records,
+# "full load" = every record turned into a Student, like load_students.
+# -------------------------------------------------------------
+def bench_binary_load(module, sizes=(100_000, 1_000_000)):
+    print("Cold-start load (seconds)")
+    print(f"{'students':>10} {'csv first':>10} {'csv full':>9} {'bin first':>10} {'bin full':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            csv_path = os.path.join(tmp, f"db{n}.txt")
+            bin_path = os.path.join(tmp, f"db{n}.bin")
+            write_csv(csv_path, make_students(n))
+            module.convert_to_binary(csv_path, bin_path)
+
+            times = []
+            for path in (csv_path, bin_path):
+                mgr = make_manager(module, [])
+                mgr.file_path = path
+                times.append(min(timeit.repeat(lambda: next(mgr.read_student_chunks()), number=1, repeat=3)))
+                times.append(min(timeit.repeat(lambda: list(mgr.read_student_chunks()), number=1, repeat=3)))
+            print(f"{n:>10} {times[0]:>10.4f} {times[1]:>9.3f} {times[2]:>10.4f} {times[3]:>9.3f}")
+
+
+# -------------------------------------------------------------
+# Benchmark: bulk import / export throughput
+# import = stream + check every row + duplicate check + insert,
+# export = stream the whole roster back out to a CSV.
+# -------------------------------------------------------------
+def bench_bulk(module, n=1_000_000):
+    print(f"Bulk import/export of {n:,} rows")
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, "import.csv")
+        write_csv(src, make_students(n))
+
+        mgr = make_manager(module, [])
+        imported, errors = [], []
+
+        def run_import():
+            for batch in module.read_import_batches(src, module.LOAD_CHUNK):
+                mgr.import_batch(batch, imported, errors)
+
+        import_s = timeit.timeit(run_import, number=1)
+        export_s = timeit.timeit(lambda: module.write_students_csv(os.path.join(tmp, "export.csv"),
+                                                                   mgr.students), number=1)
+        print(f"  import: {import_s:.2f}s ({n / import_s:,.0f} rows/s), "
+              f"{len(imported):,} added, {len(errors):,} rejected")
+        print(f"  export: {export_s:.2f}s ({n / export_s:,.0f} rows/s)")
+
+
+# -------------------------------------------------------------
+# Benchmark: startup time, core vs GUI module
+# Each one runs in a fresh python process, like a batch job would.
+# "gui import" loads "Student Manager.py" (which pulls in tkinter),
+# "core import" only loads student_core.py, and "cli report" is a whole
+# `python student_core.py report` run on a generated database.
+# -------------------------------------------------------------
+def bench_startup(n=100_000, runs=5):
+    print(f"Startup (seconds, best of {runs})")
+    gui = ("import importlib.util as u; s = u.spec_from_file_location('m', 'Student Manager.py'); "
+           "s.loader.exec_module(u.module_from_spec(s))")
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, "database.txt")
+        write_csv(db, make_students(n))
+        commands = [("gui import", ["-c", gui]),
+                    ("core import", ["-c", "import student_core"]),
+                    (f"cli report ({n:,})", ["student_core.py", "report", db])]
+        for label, args in commands:
+            def run():
+                subprocess.run([sys.executable] + args, cwd=HERE, check=True, stdout=subprocess.DEVNULL)
+            print(f"  {label:>20}: {min(timeit.repeat(run, number=1, repeat=runs)):.3f}")
+
+
+# -------------------------------------------------------------
+# Benchmark: multiprocess batch grading
+# Same file graded with 1, 2, 4, ... processes (up to the CPU count).
+# "speedup" is against 1 process - close to the worker count is ideal.
+# -------------------------------------------------------------
+def bench_batch(module, n=2_000_000):
+    cpus = os.cpu_count() or 1
+    counts = sorted({1, cpus} | {w for w in (2, 4, 8, 16) if w < cpus})
+    print(f"Batch grading {n:,} rows with sorted output ({cpus} CPUs)")
+    print(f"{'workers':>8} {'seconds':>8} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, "database.txt")
+        write_csv(src, make_students(n))
+        base = None
+        for workers in counts:
+            secs = timeit.timeit(lambda: module.batch_grade(src, workers, os.path.join(tmp, "out.txt")),
+                                 number=1)
+            base = base or secs
+            print(f"{workers:>8} {secs:>8.2f} {base / secs:>8.2f}")
+
+
+# -------------------------------------------------------------
+# Benchmark: class statistics, incremental vs rescanning the roster
+# "rescan" works everything out from the list with the statistics module,
+# "incremental" reads the running sums in ClassStats. "edit" is the extra
+# cost one change_student adds to keep the stats up to date.
+# -------------------------------------------------------------
+def bench_stats(module, sizes=(10_000, 100_000, 1_000_000)):
+    import statistics
+    print("Class statistics (milliseconds)")
+    print(f"{'students':>10} {'rescan':>10} {'incremental':>12} {'edit':>8}")
+    for n in sizes:
+        mgr = make_manager(module, make_students(n))
+
+        def rescan():
+            percents = [mgr.calculate_results(s)[2] for s in mgr.students]
+            statistics.mean(percents), statistics.median(percents), statistics.pstdev(percents)
+            [statistics.mean(marks) for marks in zip(*(s.course_marks for s in mgr.students))]
+
+        def incremental():
+            stats = mgr.stats
+            stats.mean(), stats.median(), stats.stddev(), stats.grade_counts(), stats.mark_averages()
+
+        s = mgr.students[n // 2]
+
+        def edit():
+            mgr.change_student(s, s.name, [10, 10, 10], 50)
+
+        rescan_ms = timeit.timeit(rescan, number=1) * 1000
+        inc_ms = min(timeit.repeat(incremental, number=100, repeat=3)) / 100 * 1000
+        edit_ms = min(timeit.repeat(edit, number=1000, repeat=3)) / 1000 * 1000
+        print(f"{n:>10} {rescan_ms:>10.1f} {inc_ms:>12.4f} {edit_ms:>8.4f}")
+
+
+# -------------------------------------------------------------
+# Benchmark: first screen of a sorted view
+# "full sort" = sorting the whole roster like Sort Records used to,
+# "nsmallest" = heapq partial sort of just the first page,
+# "view" = RankedView page 0 + a page from the middle (scrollbar jump).
+# -------------------------------------------------------------
+def bench_sorted_view(module, sizes=(10_000, 100_000, 1_000_000), page=20):
+    import heapq
+    print(f"First {page} sorted records (milliseconds)")
+    print(f"{'students':>10} {'full sort':>10} {'nsmallest':>10} {'view':>8} {'middle':>8}")
+    for n in sizes:
+        mgr = make_manager(module, make_students(n))
+        key = lambda s: mgr.get_results(s)[2]
+        mgr.students.sort(key=key)  # fill the results cache first so only sorting is timed
+        random.Random(n).shuffle(mgr.students)
+
+        full_ms = timeit.timeit(lambda: sorted(mgr.students, key=key)[:page], number=1) * 1000
+        heap_ms = timeit.timeit(lambda: heapq.nsmallest(page, mgr.students, key=key), number=1) * 1000
+        view_ms = min(timeit.repeat(lambda: mgr.sorted_records().page(0, page), number=100, repeat=3)) * 10
+        mid_ms = min(timeit.repeat(lambda: mgr.sorted_records().page(n // page // 2, page),
+                                   number=100, repeat=3)) * 10
+        print(f"{n:>10} {full_ms:>10.1f} {heap_ms:>10.1f} {view_ms:>8.3f} {mid_ms:>8.3f}")
+
+
+# -------------------------------------------------------------
+# SUITE
+# Same seed = same database file = comparable numbers between runs.
+# Every operation runs once untimed (so caches like the results cache and
+# the columnar arrays are filled the same way whatever --repeat is), is
+# then timed (best of `repeat`), and run once more under tracemalloc for
+# its peak memory. Results are one JSON record per
+# (operation, roster size) so an older results file can be compared.
+# -------------------------------------------------------------
+def generate_database(path, n, seed=1):
+    # streams the file out, so even 10M rows never sit in memory.
+    # same students as write_csv(path, make_students(n, seed))
+    rng = random.Random(seed)
+    with open(path, "w") as f:
+        f.write(f"{n}\n")
+        for start in range(0, n, 100_000):
+            f.write(''.join(f"{100000 + i},Student {i},{rng.randint(0, 20)},{rng.randint(0, 20)},"
+                            f"{rng.randint(0, 20)},{rng.randint(0, 100)}\n"
+                            for i in range(start, min(n, start + 100_000))))
+
+
+def measure(name, n, items, fn, repeat=3, memory=True):
+    fn()  # warm-up
+    seconds = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        seconds.append(time.perf_counter() - start)
+    best = min(seconds)
+    result = {'op': name, 'students': n, 'seconds': round(best, 6),
+              'per_second': round(items / best, 1) if best else None}
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        fn()
+        result['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result
+
+
+def measure_render(path, n):
+    # view_all in a real (hidden) Tk window - needs a display, e.g. Xvfb on a server
+    gui = load_manager_module()
+    try:
+        root = gui.tk.Tk()
+    except gui.tk.TclError as e:
+        return {'op': 'render_view_all', 'students': n, 'skipped': f"no display: {e}"}
+    root.withdraw()
+    mgr = gui.StudentManager(root, file_path=path)
+    while mgr.loading:
+        root.update()  # let the FileWorker poll hand over the chunks
+        time.sleep(0.001)
+    start = time.perf_counter()
+    mgr.view_all()
+    root.update_idletasks()  # make Tk actually lay the cards out
+    seconds = time.perf_counter() - start
+    # switching views should reuse the pooled widgets, not make new ones.
+    # the first round makes the ones view_all didn't need (stats panel)
+    views = (mgr.show_highest, mgr.show_statistics, mgr.view_all)
+    for view in views:
+        view()
+    widgets = mgr.count_widgets()
+    start = time.perf_counter()
+    for view in views:
+        view()
+    root.update_idletasks()
+    result = {'op': 'render_view_all', 'students': n, 'seconds': round(seconds, 6), 'widgets': widgets,
+              'switch_seconds': round(time.perf_counter() - start, 6),
+              'switch_new_widgets': mgr.count_widgets() - widgets}
+    root.destroy()
+    return result
+
+
+def run_suite(sizes, seed=1, repeat=3, memory=True, render=True, lookups=10_000):
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            path = os.path.join(tmp, f"database_{n}.txt")
+            generate_database(path, n, seed)
+            roster = student_core.StudentRoster(path)
+            rng = random.Random(seed + n)
+            ids = [str(100000 + rng.randrange(n)) for _ in range(lookups)]
+            ops = [
+                ("load", n, roster.load),  # first, everything else needs the data
+                ("save", n, roster.save),
+                ("lookup_by_id", lookups, lambda: [roster.find_student(sid) for sid in ids]),
+                ("highest_lowest", 1, lambda: (roster.highest_student(), roster.lowest_student())),
+                ("sort", n, roster.sort_students),
+                ("sorted_view_first_page", 20, lambda: roster.sorted_records().page(0, 20)),
+            ]
+            for name, items, fn in ops:
+                result = measure(name, n, items, fn, repeat, memory)
+                print(f"{n:>10} {name:<24} {result['seconds']:>10.4f}s", file=sys.stderr)
+                results.append(result)
+            if render:
+                results.append(measure_render(path, n))
+    return {'python': platform.python_version(), 'platform': platform.platform(),
+            'numpy': student_core.load_numpy() is not None, 'seed': seed, 'repeat': repeat,
+            'time': time.strftime("%Y-%m-%d %H:%M:%S"), 'results': results}
+
+
+def compare_results(old, new, threshold, noise=0.001):
+    # prints old vs new and returns how many ops got more than `threshold` slower.
+    # anything under `noise` seconds both times is too quick to judge
+    before = {(r['op'], r['students']): r for r in old['results'] if 'seconds' in r}
+    slower = 0
+    print(f"{'op':<24} {'students':>10} {'before':>10} {'after':>10} {'change':>8}")
+    for r in new['results']:
+        old_r = before.get((r['op'], r['students']))
+        if not old_r or 'seconds' not in r or not old_r['seconds']:
+            continue
+        change = r['seconds'] / old_r['seconds'] - 1
+        flag = ""
+        if change > threshold and max(r['seconds'], old_r['seconds']) >= noise:
+            slower += 1
+            flag = "  <-- slower"
+        print(f"{r['op']:<24} {r['students']:>10} {old_r['seconds']:>10.4f} {r['seconds']:>10.4f} "
+              f"{change:>+8.0%}{flag}")
+    return slower
+
+
+def suite_main(argv):
+    parser = argparse.ArgumentParser(prog="benchmark.py suite",
+                                     description="Repeatable Student Manager benchmarks with JSON output.")
+    parser.add_argument("--sizes", default="1000,10000,100000,1000000",
+                        help="comma separated roster sizes (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3, help="best of this many runs")
+    parser.add_argument("--out", help="write the JSON here (default: print it)")
+    parser.add_argument("--compare", help="older results JSON to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="how much slower counts as a regression (default: 0.2 = 20%%)")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc runs")
+    parser.add_argument("--no-render", action="store_true", help="skip the Tk view_all render")
+    args = parser.parse_args(argv)
+    
+    sizes = [int(size) for size in args.sizes.split(",")]
+    results = run_suite(sizes, args.seed, args.repeat, not args.no_memory, not args.no_render)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+    
+    if args.compare:
+        with open(args.compare) as f:
+            slower = compare_results(json.load(f), results, args.threshold)
+        if slower:
+            sys.exit(f"{slower} operation(s) got more than {args.threshold:.0%} slower")
+
+
+# -------------------------------------------------------------
+# Benchmark: memory per student record
+# "dict" is the old {'id', 'name', 'course_marks': [...], 'exam_mark'}
+# record, "Student" the __slots__ class. Both include the id and name
+# strings, measured with tracemalloc while a roster of n is alive.
+# -------------------------------------------------------------
+def bench_memory(n=1_000_000):
+    def as_dicts():
+        rng = random.Random(1)
+        return [{'id': str(100000 + i), 'name': f"Student {i}",
+                 'course_marks': [rng.randint(0, 20) for _ in range(3)],
+                 'exam_mark': rng.randint(0, 100)} for i in range(n)]
+
+    print(f"Memory for {n:,} student records")
+    sizes = {}
+    for label, build in (("dict", as_dicts), ("Student", lambda: make_students(n))):
+        gc.collect()
+        tracemalloc.start()
+        roster = build()
+        sizes[label] = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del roster
+        print(f"  {label:>8}: {sizes[label] / 2**20:8.1f} MiB, {sizes[label] / n:6.1f} bytes per record")
+    print(f"  saving: {1 - sizes['Student'] / sizes['dict']:.0%}")
+
+
+def main():
+    if sys.argv[1:2] == ["suite"]:
+        return suite_main(sys.argv[2:])
+    module = student_core
+    bench_startup()
+    bench_memory()
+    bench_lookup(module)
+    bench_columnar(module)
+    bench_binary_load(module)
+    bench_bulk(module)
+    bench_stats(module)
+    bench_sorted_view(module)
+    bench_batch(module)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1513 @@
+# -------------------------------------------------------------
+# STUDENT MANAGER - CORE (no GUI)
+# Description:
+# Everything Student Manager does with the data, without tkinter:
+# reading/writing the database, grading, sorting and searching.
+# "Student Manager.py" builds the window on top of this, and it can
+# also be run on its own for batch jobs on a server, e.g.
+#     python student_core.py grade database.txt
+#     python student_core.py sort database.txt --desc --out sorted.txt
+#     python student_core.py report database.txt
+#     python student_core.py batch database.txt --workers 8 --out sorted.txt
+#     python student_core.py to-binary database.txt database.bin
+# -------------------------------------------------------------
+# Sources/References:
+# - argparse: https://docs.python.org/3/library/argparse.html
+# - Modules: https://docs.python.org/3/tutorial/modules.html
+# - Process pools: https://docs.python.org/3/library/concurrent.futures.html
+# -------------------------------------------------------------
+import argparse
+import bisect
+import cProfile
+import functools
+import heapq
+import itertools
+import json
+import math
+import mmap
+import os
+import sqlite3
+import struct
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# NumPy is optional - it's only used for the columnar backend on big rosters.
+# Importing it takes longer than the rest of this module put together, so
+# it's only imported (by load_numpy) the first time a big roster needs it.
+# Source: https://numpy.org/doc/stable/user/absolute_beginners.html
+np = None
+numpy_missing = False
+
+
+def load_numpy():
+    global np, numpy_missing
+    if np is None and not numpy_missing:
+        try:
+            import numpy as np
+        except ImportError:
+            numpy_missing = True
+    return np
+
+# below this many students the plain list of Student objects is fast enough
+COLUMNAR_MIN_STUDENTS = 5000
+# how many lines the loader reads in one go
+LOAD_CHUNK = 5000
+# database files ending in this are read/written as BinaryStudentFile
+BINARY_EXT = ".bin"
+# database files ending in this are kept in SQLite (SQLiteStudentStore)
+SQLITE_EXT = ".db"
+
+
+# -------------------------------------------------------------
+# Class: Student
+# Purpose: One student record. Students used to be dicts
+#     {'id': ..., 'name': ..., 'course_marks': [cw1, cw2, cw3], 'exam_mark': ...}
+# which costs a few hundred bytes each (the dict + the list inside it).
+# With __slots__ there's no per-object __dict__, and course_marks is a
+# tuple shared by every student with the same three marks (there are
+# only 21*21*21 possible ones), so a million students use a lot less memory.
+# `results` is the (coursework, total, percent, grade) tuple once
+# get_results has worked it out, or None.
+# Source for __slots__: https://docs.python.org/3/reference/datamodel.html#slots
+# -------------------------------------------------------------
+class Student:
+    __slots__ = ('id', 'name', 'course_marks', 'exam_mark', 'results')
+
+    def __init__(self, sid, name, course_marks, exam_mark):
+        self.id = sid
+        self.name = name
+        self.course_marks = shared_marks(course_marks)
+        self.exam_mark = exam_mark
+        self.results = None
+
+    def __repr__(self):
+        return f"Student({self.id!r}, {self.name!r}, {self.course_marks}, {self.exam_mark})"
+
+
+MARKS = {}  # (cw1, cw2, cw3) -> the one tuple everyone with those marks uses
+
+
+def shared_marks(marks):
+    marks = tuple(marks)
+    return MARKS.setdefault(marks, marks)
+
+
+# -------------------------------------------------------------
+# Class: ColumnarStudents
+# Purpose: Keep the marks of the whole roster as NumPy arrays (one
+# "column" per field) instead of one Student object each. Totals,
+# percentages and grades for EVERY student are then worked out in a
+# single vectorized step, and sorting/highest/lowest become
+# argsort/argmax/argmin on one array instead of a Python call per
+# student. Used by sort_students and the grade/report commands.
+# Row i here is always the same student as self.students[i].
+# Source for argsort: https://numpy.org/doc/stable/reference/generated/numpy.argsort.html
+# Source for searchsorted: https://numpy.org/doc/stable/reference/generated/numpy.searchsorted.html
+# -------------------------------------------------------------
+class ColumnarStudents:
+    GRADE_LIMITS = [40, 50, 60, 70]  # same boundaries as grade_marks
+    LETTERS = "FDCBA"
+
+    def __init__(self, coursework, exam):
+        self.coursework = coursework  # n x 3 matrix of coursework marks
+        self.exam = exam              # vector of exam marks
+        # one pass over the whole roster - no Python loop per student
+        self.coursework_totals = coursework.sum(axis=1, dtype=np.int32)
+        self.totals = self.coursework_totals + exam
+        self.percents = self.totals / 160 * 100
+        # searchsorted counts how many grade limits each percent has reached
+        self.grade_index = np.searchsorted(self.GRADE_LIMITS, self.percents, side='right')
+        self.grades = np.array(list(self.LETTERS))[self.grade_index]
+
+    @classmethod
+    def from_students(cls, students):
+        n = len(students)
+        coursework = np.array([s.course_marks for s in students], dtype=np.int16).reshape(n, 3)
+        exam = np.fromiter((s.exam_mark for s in students), dtype=np.int16, count=n)
+        return cls(coursework, exam)
+
+    def __len__(self):
+        return len(self.exam)
+
+    def results_range(self, start, stop):
+        # same tuples as grade_marks for rows start..stop-1 (tolist gives plain Python values)
+        return zip(self.coursework_totals[start:stop].tolist(), self.totals[start:stop].tolist(),
+                   self.percents[start:stop].tolist(), self.grades[start:stop].tolist())
+
+    def grade_counts(self):
+        counts = np.bincount(self.grade_index, minlength=len(self.LETTERS))
+        return {grade: int(counts[i]) for i, grade in enumerate(self.LETTERS)}
+
+    def argmax(self):
+        return int(np.argmax(self.percents))  # first one wins on a tie, like max()
+
+    def argmin(self):
+        return int(np.argmin(self.percents))
+
+    def argsort(self, reverse=False):
+        # stable sort so equal percentages keep their order, like list.sort()
+        key = -self.percents if reverse else self.percents
+        return np.argsort(key, kind='stable')
+
+
+# -------------------------------------------------------------
+# Class: BinaryStudentFile
+# Purpose: Optional fixed-width binary version of database.txt.
+# Every record is exactly RECORD.size bytes, so record i starts at
+#     HEADER.size + i * RECORD.size
+# and can be read straight out of the memory-mapped file without
+# splitting or int()-ing a whole text file first.
+#   header: b"STU1" + number of records (uint32)
+#   record: id (16 bytes) + name (48 bytes) + cw1, cw2, cw3, exam (1 byte each)
+# A database path ending in BINARY_EXT uses this format instead of CSV.
+# Source for struct: https://docs.python.org/3/library/struct.html
+# Source for mmap: https://docs.python.org/3/library/mmap.html
+# -------------------------------------------------------------
+class BinaryStudentFile:
+    MAGIC = b"STU1"
+    ID_BYTES, NAME_BYTES = 16, 48  # fixed-size fields, padded with \0
+    HEADER = struct.Struct("<4sI")
+    RECORD = struct.Struct(f"<{ID_BYTES}s{NAME_BYTES}s4B")
+
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        try:
+            self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # mmap can't map an empty file
+            self.file.close()
+            raise ValueError("Binary database file is empty.")
+        magic, self.count = self.HEADER.unpack_from(self.mm, 0)
+        if magic != self.MAGIC:
+            self.close()
+            raise ValueError("Not a binary student database.")
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        # decodes just this one record, straight from the mapped file
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        return self.decode(self.RECORD.unpack_from(self.mm, self.HEADER.size + i * self.RECORD.size))
+
+    def read_range(self, start, stop):
+        stop = min(stop, self.count)
+        begin = self.HEADER.size + start * self.RECORD.size
+        end = self.HEADER.size + stop * self.RECORD.size
+        return [self.decode(rec) for rec in self.RECORD.iter_unpack(self.mm[begin:end])]
+
+    def decode(self, rec):
+        sid, name, cw1, cw2, cw3, exam = rec
+        return Student(sid.rstrip(b"\0").decode(), name.rstrip(b"\0").decode(), (cw1, cw2, cw3), exam)
+
+    def close(self):
+        self.mm.close()
+        self.file.close()
+
+    # lets us use "with BinaryStudentFile(path) as db:"
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @classmethod
+    def fits(cls, student_id, name):
+        # measured in bytes, so an accented letter counts as 2
+        return len(student_id.encode()) <= cls.ID_BYTES and len(name.encode()) <= cls.NAME_BYTES
+
+    @classmethod
+    def write_to(cls, f, rows):
+        # rows are split CSV lines: [id, name, cw1, cw2, cw3, exam]
+        f.write(cls.HEADER.pack(cls.MAGIC, len(rows)))
+        for data in rows:
+            sid, name = data[0].encode(), data[1].encode()
+            if not cls.fits(data[0], data[1]):
+                raise ValueError(f"ID or name too long for the binary format: {data[0]}")
+            f.write(cls.RECORD.pack(sid, name, *map(int, data[2:6])))
+
+
+# -------------------------------------------------------------
+# Converters between database.txt and the binary format
+# (count header then id,name,cw1,cw2,cw3,exam on each line)
+# Both write a temp file and rename it, same as save_students.
+# -------------------------------------------------------------
+def convert_to_binary(csv_path, bin_path):
+    with open(csv_path, "r") as f:
+        lines = [line.strip() for line in f]
+    if lines and lines[0].isdigit():
+        lines = lines[1:]
+    rows = [data for data in (line.split(',') for line in lines) if len(data) >= 6]
+    
+    with open(bin_path + ".tmp", "wb") as f:
+        BinaryStudentFile.write_to(f, rows)
+    os.replace(bin_path + ".tmp", bin_path)
+    return len(rows)
+
+
+def convert_to_csv(bin_path, csv_path):
+    with BinaryStudentFile(bin_path) as db, open(csv_path + ".tmp", "w") as f:
+        f.write(f"{len(db)}\n")
+        for start in range(0, len(db), LOAD_CHUNK):
+            for s in db.read_range(start, start + LOAD_CHUNK):
+                marks = ','.join(map(str, s.course_marks))
+                f.write(f"{s.id},{s.name},{marks},{s.exam_mark}\n")
+        count = len(db)
+    os.replace(csv_path + ".tmp", csv_path)
+    return count
+
+
+# -------------------------------------------------------------
+# Function: grade_marks
+# Purpose: The grading maths on its own (no roster needed), so the
+# batch grader's worker processes use exactly the same rules.
+# Returns (coursework total, total, percent, grade).
+# -------------------------------------------------------------
+def grade_marks(total_coursework, exam_mark):
+    total = total_coursework + exam_mark  # max 60 + 100 = 160
+    percent = (total / 160) * 100
+    
+    # loop through grade boundaries from highest to lowest
+    for limit, grade in [(70, 'A'), (60, 'B'), (50, 'C'), (40, 'D')]:
+        if percent >= limit:
+            break
+    else:
+        grade = 'F'  # runs if we never hit break
+    
+    return total_coursework, total, percent, grade
+
+
+# -------------------------------------------------------------
+# Function: check_student
+# Purpose: The rules from the Add Student form in one place, so the form
+# and bulk import can't drift apart. marks = [cw1, cw2, cw3, exam] as
+# typed (strings are fine). Returns (student, None) or (None, error).
+# Duplicate IDs are checked by the caller since that needs the index.
+# -------------------------------------------------------------
+def check_student(student_id, name, marks):
+    if not student_id or not name:
+        return None, "ID and Name are required!"
+    try:
+        cw1, cw2, cw3, exam = (int(m) for m in marks)
+    except ValueError:
+        return None, "Please enter valid numbers for marks!"
+    
+    # Validate mark ranges
+    if not (0 <= cw1 <= 20 and 0 <= cw2 <= 20 and 0 <= cw3 <= 20):
+        return None, "Coursework marks must be between 0 and 20!"
+    if not (0 <= exam <= 100):
+        return None, "Exam mark must be between 0 and 100!"
+    
+    return Student(student_id, name, (cw1, cw2, cw3), exam), None
+
+
+# -------------------------------------------------------------
+# Bulk import / export
+# read_import_batches streams a CSV (same layout as database.txt, the
+# count header is optional) and checks each row with check_student,
+# handing back `size` rows at a time as (line number, raw line, student, error).
+# write_students_csv streams the roster out in the database.txt layout.
+# -------------------------------------------------------------
+def read_import_batches(path, size):
+    with open(path, "r") as f:
+        batch = []
+        for line_no, line in enumerate(f, start=1):
+            raw = line.strip()
+            if not raw or (line_no == 1 and raw.isdigit()):
+                continue  # blank line or count header
+            data = raw.split(',')
+            if len(data) < 6:
+                student, error = None, "Expected id,name,cw1,cw2,cw3,exam"
+            else:
+                student, error = check_student(data[0].strip(), data[1].strip(), data[2:6])
+            batch.append((line_no, raw, student, error))
+            if len(batch) >= size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+
+def write_students_csv(path, students):
+    with open(path + ".tmp", "w") as f:
+        f.write(f"{len(students)}\n")
+        for start in range(0, len(students), LOAD_CHUNK):
+            # join a chunk at a time - far fewer write() calls than one per student
+            f.write(''.join(f"{s.id},{s.name},{','.join(map(str, s.course_marks))},"
+                            f"{s.exam_mark}\n" for s in students[start:start + LOAD_CHUNK]))
+    os.replace(path + ".tmp", path)
+    return len(students)
+
+
+# -------------------------------------------------------------
+# Helper: read_journal_file
+# Returns the journal lines split by comma, ready for apply_change.
+# A half-written last line (from a crash) is skipped and cut off the
+# file so the next edit starts on a fresh line.
+# -------------------------------------------------------------
+def read_journal_file(path):
+    entries = []
+    try:
+        good_bytes = 0
+        with open(path, "rb") as f:  # binary so we can count bytes
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # half-written last line from a crash, skip it
+                good_bytes += len(line)
+                entries.append(line.decode().rstrip("\r\n").split(','))
+        if good_bytes < os.path.getsize(path):
+            os.truncate(path, good_bytes)
+    except FileNotFoundError:
+        pass
+    return entries
+
+
+# -------------------------------------------------------------
+# Class: SQLiteStudentStore
+# Purpose: Optional SQLite storage instead of database.txt.
+# Every add/update/delete is its own single-row transaction (no full
+# rewrite and no journal), and there's an index on the percentage so
+# highest/lowest come straight out of the index. The sorted view for the
+# window still comes from the in-memory ranking - OFFSET has to walk past
+# every row before it, so jumping to the middle of a big table was slow.
+# A database path ending in SQLITE_EXT uses this. The first time, it
+# copies in the old database.txt (or .bin) with the same name plus
+# that file's journal - in the same transaction that makes the table, so
+# if the copy fails nothing is kept and it's tried again next time.
+# Marks must really be numbers (CHECK), so a broken line in the old file
+# is skipped like the loader would instead of breaking every load after.
+# The worker thread writes and the Tk thread reads, so every query
+# holds self.lock.
+# Source for sqlite3: https://docs.python.org/3/library/sqlite3.html
+# Source for indexes on expressions: https://www.sqlite.org/expridx.html
+# -------------------------------------------------------------
+class SQLiteStudentStore:
+    # must be written exactly like this in queries so SQLite uses the index
+    PERCENT = "(cw1 + cw2 + cw3 + exam) * 100.0 / 160"
+    COLUMNS = "id, name, cw1, cw2, cw3, exam"
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.conn:
+            # sqlite3 doesn't start a transaction for CREATE on its own
+            self.conn.execute("BEGIN")
+            first_use = self.conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' "
+                                          "AND name = 'students'").fetchone() is None
+            self.conn.execute("""CREATE TABLE IF NOT EXISTS students (
+                                     id TEXT PRIMARY KEY,
+                                     name TEXT NOT NULL,
+                                     cw1 INTEGER NOT NULL CHECK (typeof(cw1) = 'integer'),
+                                     cw2 INTEGER NOT NULL CHECK (typeof(cw2) = 'integer'),
+                                     cw3 INTEGER NOT NULL CHECK (typeof(cw3) = 'integer'),
+                                     exam INTEGER NOT NULL CHECK (typeof(exam) = 'integer'))""")
+            self.conn.execute(f"CREATE INDEX IF NOT EXISTS students_percent ON students ({self.PERCENT})")
+            if first_use:
+                self.migrate()
+
+    def migrate(self):
+        # runs inside __init__'s transaction
+        base = os.path.splitext(self.path)[0]
+        for old_path in (base + ".txt", base + BINARY_EXT):
+            if os.path.exists(old_path):
+                break
+        else:
+            return  # nothing to copy in - start empty
+        
+        if old_path.endswith(BINARY_EXT):
+            with BinaryStudentFile(old_path) as db:
+                rows = [[s.id, s.name, *s.course_marks, s.exam_mark]
+                        for s in db.read_range(0, len(db))]
+        else:
+            with open(old_path, "r") as f:
+                lines = [line.strip() for line in f]
+            if lines and lines[0].isdigit():
+                lines = lines[1:]
+            rows = []
+            for data in (line.split(',') for line in lines):
+                try:
+                    rows.append([data[0], data[1], *map(int, data[2:6])])
+                except (ValueError, IndexError):
+                    continue  # broken line - skip it
+        
+        # OR IGNORE so the FIRST record wins on a duplicate ID, like load_students
+        self.conn.executemany(f"INSERT OR IGNORE INTO students ({self.COLUMNS}) "
+                              "VALUES (?, ?, ?, ?, ?, ?)", rows)
+        for path in (old_path + ".journal.old", old_path + ".journal"):
+            for data in read_journal_file(path):
+                try:
+                    self.apply_entry(data)
+                except (ValueError, IndexError):
+                    continue  # broken line - replay_journal skips these too
+
+    # -------------------------------------------------------------
+    # Writing - data is a split journal line: [op, id, name, cw1, cw2, cw3, exam]
+    # -------------------------------------------------------------
+    def apply(self, data):
+        with self.lock, self.conn:  # commits (or rolls back) just this one change
+            self.apply_entry(data)
+
+    def insert_many(self, students):
+        # bulk import - every row in ONE transaction
+        with self.lock, self.conn:
+            self.conn.executemany(f"INSERT INTO students ({self.COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)",
+                                  ((s.id, s.name, *s.course_marks, s.exam_mark)
+                                   for s in students))
+
+    def apply_entry(self, data):
+        if data[0] == 'D':
+            self.conn.execute("DELETE FROM students WHERE id = ?", (data[1],))
+        elif data[0] in ('A', 'U') and len(data) >= 7:
+            self.conn.execute(f"INSERT INTO students ({self.COLUMNS}) VALUES (?, ?, ?, ?, ?, ?) "
+                              "ON CONFLICT(id) DO UPDATE SET name = excluded.name, "
+                              "cw1 = excluded.cw1, cw2 = excluded.cw2, cw3 = excluded.cw3, "
+                              "exam = excluded.exam",
+                              (data[1], data[2], *map(int, data[3:7])))
+
+    # -------------------------------------------------------------
+    # Reading
+    # -------------------------------------------------------------
+    def to_student(self, row):
+        return Student(row[0], row[1], row[2:5], row[5])
+
+    def read_chunks(self, size):
+        # rowid > last instead of OFFSET, so each chunk is an index seek
+        last = 0
+        while True:
+            with self.lock:
+                rows = self.conn.execute(f"SELECT rowid, {self.COLUMNS} FROM students "
+                                         "WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                                         (last, size)).fetchall()
+            if not rows:
+                return
+            last = rows[-1][0]
+            yield [self.to_student(row[1:]) for row in rows]
+
+    def count(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM students").fetchone()[0]
+
+    def first_id(self, reverse=False):
+        # rowid breaks ties so it matches a stable Python sort
+        order = "DESC" if reverse else "ASC"
+        with self.lock:
+            row = self.conn.execute(f"SELECT id FROM students "
+                                    f"ORDER BY {self.PERCENT} {order}, rowid LIMIT 1").fetchone()
+        return row[0] if row else None
+
+    def highest_id(self):
+        return self.first_id(reverse=True)
+
+    def lowest_id(self):
+        return self.first_id()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+# -------------------------------------------------------------
+# Class: ScoreRanking
+# Purpose: Keep students ordered by score all the time, so Highest,
+# Lowest, Top N and rank don't have to look at every student.
+# A total can only be 0-160, so there's one "bucket" per total
+# (a dict of id -> student, which remembers insertion order) plus a
+# Fenwick tree of bucket sizes for counting how many are above a score.
+#   add/remove/update: O(1) bucket change + O(log 161) tree update
+#   highest/lowest:    first non-empty bucket from either end (161 max)
+#   rank:              O(log 161)
+#   kth_total:         O(log 161) (used for the median)
+#   slice:             O(log 161) to find the start + the students handed back
+# Source for Fenwick trees: https://en.wikipedia.org/wiki/Fenwick_tree
+# -------------------------------------------------------------
+class ScoreRanking:
+    MAX_TOTAL = 160
+
+    def __init__(self, students=()):
+        self.buckets = [{} for _ in range(self.MAX_TOTAL + 1)]
+        self.tree = [0] * (self.MAX_TOTAL + 2)  # Fenwick tree is 1-based
+        self.totals = {}  # id -> total, so remove() knows which bucket to look in
+        self.version = 0  # goes up on every change so views know their pages are old
+        for s in students:
+            self.add(s)
+
+    def __len__(self):
+        return len(self.totals)
+
+    def add(self, s):
+        total = sum(s.course_marks) + s.exam_mark
+        self.buckets[total][s.id] = s
+        self.totals[s.id] = total
+        self.change_count(total, 1)
+
+    def remove(self, sid):
+        total = self.totals.pop(sid, None)
+        if total is not None:
+            del self.buckets[total][sid]
+            self.change_count(total, -1)
+
+    def update(self, s):
+        self.remove(s.id)
+        self.add(s)
+
+    def change_count(self, total, amount):
+        self.version += 1
+        i = total + 1
+        while i < len(self.tree):
+            self.tree[i] += amount
+            i += i & -i
+
+    def count_at_or_below(self, total):
+        i, count = total + 1, 0
+        while i > 0:
+            count += self.tree[i]
+            i -= i & -i
+        return count
+
+    def kth_total(self, k):
+        # total of the k-th lowest student (1-based), by walking down the tree
+        pos, step = 0, 1 << ((len(self.tree) - 1).bit_length() - 1)
+        while step:
+            if pos + step < len(self.tree) and self.tree[pos + step] < k:
+                pos += step
+                k -= self.tree[pos]
+            step >>= 1
+        return pos  # tree index pos + 1 = total pos
+
+    def rank(self, sid):
+        # 1 = best; students with the same total share a rank
+        total = self.totals.get(sid)
+        if total is None:
+            return None
+        return len(self) - self.count_at_or_below(total) + 1
+
+    def slice(self, start, count, reverse=False):
+        # `count` students from position `start` in score order (lowest first,
+        # or highest first if reverse). The Fenwick counts say which bucket
+        # position `start` is in, so nothing before it has to be walked.
+        n = len(self)
+        if start >= n:
+            return []
+        if reverse:
+            total = self.kth_total(n - start)
+            skip = start - (n - self.count_at_or_below(total))
+            totals = range(total, -1, -1)
+        else:
+            total = self.kth_total(start + 1)
+            skip = start - self.count_at_or_below(total - 1)
+            totals = range(total, self.MAX_TOTAL + 1)
+        found = []
+        for total in totals:
+            found.extend(itertools.islice(self.buckets[total].values(), skip, skip + count - len(found)))
+            skip = 0
+            if len(found) == count:
+                break
+        return found
+
+    def in_order(self, reverse=False):
+        # every student in score order (same order slice() uses)
+        totals = range(self.MAX_TOTAL, -1, -1) if reverse else range(self.MAX_TOTAL + 1)
+        for total in totals:
+            yield from self.buckets[total].values()
+
+    def top(self, n):
+        return self.slice(0, n, reverse=True)
+
+    def bottom(self, n):
+        return self.slice(0, n)
+
+    def highest(self):
+        best = self.top(1)
+        return best[0] if best else None
+
+    def lowest(self):
+        worst = self.bottom(1)
+        return worst[0] if worst else None
+
+
+# -------------------------------------------------------------
+# Class: RankedView
+# Purpose: The roster sorted by score WITHOUT reordering self.students
+# (so sorting doesn't change what gets saved). It's read straight out of
+# the ScoreRanking, so the first page costs about a page of work instead
+# of sorting a million students, and jumping anywhere with the scrollbar
+# is just as quick. Pages are cached and thrown away when the ranking
+# changes. Students with the same score stay in
+# the order they were added.
+# -------------------------------------------------------------
+class RankedView:
+    PAGE_SIZE = 200
+
+    def __init__(self, ranking, reverse=False):
+        self.ranking = ranking
+        self.reverse = reverse
+        self.pages = {}  # page number -> list of students
+        self.version = ranking.version
+
+    def __len__(self):
+        return len(self.ranking)
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        if self.version != self.ranking.version:  # someone was added/changed/deleted
+            self.pages, self.version = {}, self.ranking.version
+        page = i // self.PAGE_SIZE
+        if page not in self.pages:
+            self.pages[page] = self.ranking.slice(page * self.PAGE_SIZE, self.PAGE_SIZE, self.reverse)
+        return self.pages[page][i % self.PAGE_SIZE]
+
+    def __iter__(self):
+        return self.ranking.in_order(self.reverse)
+
+    def page(self, number, size):
+        # students on page `number` (0-based) when showing `size` per page
+        return self.ranking.slice(number * size, size, self.reverse)
+
+
+# -------------------------------------------------------------
+# Class: ClassStats
+# Purpose: Class statistics for the dashboard that are kept up to date
+# on every add/update/delete instead of going through every student:
+#   mean / std dev:       running sum and sum of squares of the totals
+#   coursework averages:  running sum per mark
+#   median:               kth_total on the ScoreRanking
+#   grade distribution:   bucket sizes in the ScoreRanking (161 of them)
+# The sums are ints (totals, not percentages) so they never drift.
+# Source for std dev: https://en.wikipedia.org/wiki/Standard_deviation
+# -------------------------------------------------------------
+class ClassStats:
+    def __init__(self, ranking, students=()):
+        self.ranking = ranking
+        self.count = 0
+        self.total_sum = 0
+        self.total_squares = 0
+        self.mark_sums = [0, 0, 0, 0]  # cw1, cw2, cw3, exam
+        for s in students:
+            self.add(s)
+
+    def add(self, s, sign=1):
+        cw1, cw2, cw3 = s.course_marks
+        total = cw1 + cw2 + cw3 + s.exam_mark
+        self.count += sign
+        self.total_sum += sign * total
+        self.total_squares += sign * total * total
+        sums = self.mark_sums
+        sums[0] += sign * cw1
+        sums[1] += sign * cw2
+        sums[2] += sign * cw3
+        sums[3] += sign * s.exam_mark
+
+    def remove(self, s):
+        # s must still have the marks it was added with
+        self.add(s, -1)
+
+    def mean(self):
+        return self.total_sum / self.count / 160 * 100 if self.count else 0.0
+
+    def stddev(self):
+        if not self.count:
+            return 0.0
+        # population std dev: sqrt(E[x^2] - E[x]^2), done in ints until the end
+        variance = (self.count * self.total_squares - self.total_sum ** 2) / self.count ** 2
+        return math.sqrt(variance) / 160 * 100
+
+    def median(self):
+        n = len(self.ranking)
+        if not n:
+            return 0.0
+        middle = (self.ranking.kth_total((n + 1) // 2) + self.ranking.kth_total(n // 2 + 1)) / 2
+        return middle / 160 * 100
+
+    def grade_counts(self):
+        counts = dict.fromkeys('ABCDF', 0)
+        for total, bucket in enumerate(self.ranking.buckets):
+            if bucket:
+                counts[grade_marks(0, total)[3]] += len(bucket)
+        return counts
+
+    def mark_averages(self):
+        # [cw1, cw2, cw3, exam] averages
+        return [m / self.count if self.count else 0.0 for m in self.mark_sums]
+
+
+# -------------------------------------------------------------
+# Class: StudentSearch
+# Purpose: The "id - name" list shared by every student dropdown, plus a
+# sorted index of search terms (the ID, the full name and each word of
+# the name) so typing a few letters finds matches with a binary search
+# instead of scrolling through a dropdown with the whole roster in it.
+# The index is a handful of sorted "runs" instead of one big list: new
+# terms collect in self.pending, get sorted into a run of their own and
+# merged with the newest runs until a run holds RUN_SIZE terms. Big runs
+# are never merged again, so adding a student never re-sorts millions of
+# terms - a search just does one binary search per run and merges what
+# they find. flush() is called when loading finishes, so the first
+# keypress only has the last few edits to sort.
+# Removed/renamed students are just dropped from self.labels - their old
+# terms are skipped when searching and cleaned up once there are lots.
+# Source for bisect: https://docs.python.org/3/library/bisect.html
+# Source for heapq.merge: https://docs.python.org/3/library/heapq.html#heapq.merge
+# -------------------------------------------------------------
+class StudentSearch:
+    RUN_SIZE = 1 << 15  # a run this big takes ~10 ms to sort
+
+    def __init__(self, students=()):
+        self.labels = {}    # id -> "id - name" (what the dropdowns show)
+        self.runs = []      # sorted lists of (search term, id), oldest first
+        self.pending = []   # (term, id) not sorted into a run yet
+        self.size = 0       # terms in self.runs
+        self.stale = 0      # terms left behind by removed/renamed students
+        for s in students:
+            self.add(s)
+        self.flush()
+
+    def terms_for(self, label):
+        sid, name = label.split(" - ", 1)
+        return {label.lower(), sid.lower(), name.lower(), *name.lower().split()}
+
+    def add(self, s):
+        label = f"{s.id} - {s.name}"
+        self.labels[s.id] = label
+        self.pending.extend((term, s.id) for term in self.terms_for(label))
+        if len(self.pending) >= self.RUN_SIZE:
+            self.flush()  # loading: sort as we go so there's no big sort at the end
+
+    def remove(self, sid):
+        label = self.labels.pop(sid, None)
+        if label:
+            self.stale += len(self.terms_for(label))
+
+    def update(self, s):
+        if self.labels.get(s.id) != f"{s.id} - {s.name}":
+            self.remove(s.id)
+            self.add(s)
+
+    def flush(self):
+        if self.stale > self.size // 2:
+            # more than half the index is junk - rebuild it from the labels
+            self.runs, self.size, self.stale = [], 0, 0
+            self.pending = [(term, sid) for sid, label in self.labels.items()
+                            for term in self.terms_for(label)]
+        while self.pending:
+            run = sorted(self.pending[:self.RUN_SIZE])
+            del self.pending[:self.RUN_SIZE]
+            self.add_run(run)
+
+    def add_run(self, run):
+        self.size += len(run)
+        # merge small runs into the newest one (Timsort just merges the two sorted runs)
+        while self.runs and len(self.runs[-1]) + len(run) <= self.RUN_SIZE:
+            run = self.runs.pop() + run
+            run.sort()
+        self.runs.append(run)
+
+    def matching(self, run, query):
+        # every (term, id) in one run that starts with query, in order
+        i = bisect.bisect_left(run, (query,))
+        while i < len(run) and run[i][0].startswith(query):
+            yield run[i]
+            i += 1
+
+    def search(self, text, limit):
+        query = text.strip().lower()
+        if not query:
+            return list(itertools.islice(self.labels.values(), limit))
+        
+        self.flush()
+        matches, seen = [], set()
+        for term, sid in heapq.merge(*(self.matching(run, query) for run in self.runs)):
+            if len(matches) >= limit:
+                break
+            label = self.labels.get(sid)
+            if sid in seen or label is None:
+                continue
+            # an old term from before a rename - check the current name still matches
+            if not any(t.startswith(query) for t in self.terms_for(label)):
+                continue
+            seen.add(sid)
+            matches.append(label)
+        return matches
+
+
+# -------------------------------------------------------------
+# Class: Metrics
+# Purpose: Find out where the time goes when the app gets slow.
+#   timers:   calls / total / slowest per operation ("load", "view_all"...)
+#   counters: plain counts, e.g. widgets made and destroyed by the window
+#   profile:  an opt-in cProfile run, saved as a .prof file for pstats
+# dump() writes it all to a JSON file so two runs (or two storage /
+# rendering backends) can be compared side by side.
+# widget_count is set by the window: when it's there, every outermost
+# timer also records how many widgets that operation left behind.
+# Source for cProfile/pstats: https://docs.python.org/3/library/profile.html
+# Source for contextmanager: https://docs.python.org/3/library/contextlib.html
+# -------------------------------------------------------------
+class Metrics:
+    def __init__(self):
+        self.timers = {}  # name -> {'calls', 'total_s', 'max_s', 'widgets_created'}
+        self.counters = {}  # name -> number
+        self.widget_count = None  # function returning how many widgets exist
+        self.profiler = None  # cProfile.Profile while profiling is on
+        self.lock = threading.Lock()  # the FileWorker thread records timings too
+        self.local = threading.local()  # how deep in nested timers each thread is
+
+    def count(self, name, amount=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def record(self, name, seconds, widgets=0):
+        with self.lock:
+            t = self.timers.setdefault(name, {'calls': 0, 'total_s': 0.0, 'max_s': 0.0,
+                                              'widgets_created': 0})
+            t['calls'] += 1
+            t['total_s'] += seconds
+            t['max_s'] = max(t['max_s'], seconds)
+            t['widgets_created'] += widgets
+
+    @contextmanager
+    def timer(self, name):
+        depth = getattr(self.local, 'depth', 0)
+        self.local.depth = depth + 1
+        # only count widgets for the outermost timer, so nothing is counted twice
+        counting = depth == 0 and self.widget_count and threading.current_thread() is threading.main_thread()
+        if counting:
+            alive, destroyed = self.widget_count(), self.counters.get('widgets_destroyed', 0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            self.local.depth = depth
+            created = 0
+            if counting:
+                # anything destroyed during the operation was alive at some point too
+                created = max(0, self.widget_count() - alive
+                              + self.counters.get('widgets_destroyed', 0) - destroyed)
+                self.count('widgets_created', created)
+            self.record(name, seconds, created)
+
+    def toggle_profile(self, path):
+        # returns True if profiling just started, False if it stopped and was saved
+        if self.profiler is None:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+            return True
+        self.profiler.disable()
+        self.profiler.dump_stats(path)  # open with: python -m pstats <path>
+        self.profiler = None
+        self.count('profiles_saved')
+        return False
+
+    def snapshot(self):
+        with self.lock:
+            timers = {name: dict(t, mean_s=t['total_s'] / t['calls']) for name, t in self.timers.items()}
+            return {'time': time.strftime("%Y-%m-%d %H:%M:%S"), 'timers': timers,
+                    'counters': dict(self.counters)}
+
+    def dump(self, path):
+        with open(path + ".tmp", "w") as f:
+            json.dump(self.snapshot(), f, indent=2, sort_keys=True)
+        os.replace(path + ".tmp", path)
+
+
+def timed(name):
+    # decorator for methods of anything with a .metrics, e.g. @timed("save")
+    def decorate(method):
+        @functools.wraps(method)
+        def run(self, *args, **kwargs):
+            with self.metrics.timer(name):
+                return method(self, *args, **kwargs)
+        return run
+    return decorate
+
+
+# -------------------------------------------------------------
+# Class: StudentRoster
+# Purpose: All the student data and file handling WITHOUT a window -
+# the list, the lookups, grading, sorting and reading/writing the
+# database. StudentManager (the Tk app) is built on top of this, and
+# the command line below uses it directly so it never loads tkinter.
+# -------------------------------------------------------------
+class StudentRoster:
+    def __init__(self, file_path):
+        self.file_path = file_path
+        # edits get appended here instead of rewriting the whole database every time
+        self.journal_path = file_path + ".journal"
+        self.journal_count = 0  # how many edits are waiting in the journal
+        self.store = None  # SQLiteStudentStore when the database is a .db file
+        self.loading = False  # True while the rest of the file is still being read
+        self.busy = False  # True while an import/export is running - no edits until it's done
+        self.metrics = Metrics()  # timings/counters, see Metrics
+        self.reset()
+
+    def reset(self):
+        self.students = []  # list to store all student data as Student objects
+        self.index = {}  # id -> Student, so lookups don't scan the whole list
+        self.ranking = ScoreRanking()  # students ordered by score, kept up to date
+        self.stats = ClassStats(self.ranking)  # mean/median/etc for the dashboard
+        self.search = StudentSearch()  # "id - name" list + type-ahead index for dropdowns
+        self.columns = None  # ColumnarStudents copy for big rosters (built when needed)
+        self.expected_count = 0  # from the header line, just for progress text
+
+    # -------------------------------------------------------------
+    # Function: load / save
+    # Plain blocking versions for scripts. The window does the same
+    # steps on its worker thread (see StudentManager.load_students).
+    # -------------------------------------------------------------
+    @timed("load")
+    def load(self):
+        self.reset()
+        self.open_store()
+        for chunk in self.read_student_chunks():
+            self.add_students(chunk)
+        self.replay_journal(self.read_journal())
+        self.search.flush()  # build the search index now, not on the first keypress
+
+    @timed("save")
+    def save(self):
+        if self.store:
+            return  # SQLite commits every change straight away
+        self.rotate_journal()
+        self.write_database([self.student_line(s) for s in self.students])
+        self.journal_count = 0
+
+    def open_store(self):
+        if self.file_path.endswith(SQLITE_EXT) and self.store is None:
+            self.store = SQLiteStudentStore(self.file_path)  # migrates on first use
+
+    def read_student_chunks(self):
+        # generator - reads the file lazily and hands back a list at a time
+        if self.store:
+            yield from self.store.read_chunks(LOAD_CHUNK)
+            return
+        
+        if self.file_path.endswith(BINARY_EXT):
+            # binary file: nothing to parse, just slice records out of the mmap
+            with BinaryStudentFile(self.file_path) as db:
+                self.expected_count = len(db)
+                for start in range(0, len(db), LOAD_CHUNK):
+                    yield db.read_range(start, start + LOAD_CHUNK)
+            return
+        
+        with open(self.file_path, "r") as f:
+            chunk = []
+            for n, line in enumerate(f):
+                # Skip header line if it contains a number
+                if n == 0 and line.strip().isdigit():
+                    self.expected_count = int(line)
+                    continue
+                
+                data = line.strip().split(',')  # split by comma
+                
+                if len(data) >= 6:
+                    chunk.append(self.parse_student(data))
+                if len(chunk) >= LOAD_CHUNK:
+                    yield chunk
+                    chunk = []
+            if chunk:
+                yield chunk
+
+    def add_students(self, chunk):
+        self.students.extend(chunk)
+        for s in chunk:
+            if self.index.setdefault(s.id, s) is s:  # FIRST record wins on a duplicate ID
+                self.ranking.add(s)
+                self.stats.add(s)
+                self.search.add(s)
+
+    # -------------------------------------------------------------
+    # Helper: turn one split line into a Student (and back again)
+    # -------------------------------------------------------------
+    def parse_student(self, data):
+        # Student object instead of list - easier to access by name
+        return Student(data[0], data[1], map(int, data[2:5]), int(data[5]))  # convert to int
+
+    def student_line(self, s):
+        marks = ','.join(map(str, s.course_marks))
+        return f"{s.id},{s.name},{marks},{s.exam_mark}"
+
+    # -------------------------------------------------------------
+    # Helper: keep the id -> student index in sync with the list
+    # A dict lookup is O(1) so it stays fast even with a huge roster,
+    # unlike next()/any() which have to walk through every student.
+    # Source: https://docs.python.org/3/tutorial/datastructures.html#dictionaries
+    # -------------------------------------------------------------
+    def rebuild_index(self):
+        # for a list that was filled in directly (benchmark.py does this) -
+        # the same steps as loading it from a file, so duplicate IDs and
+        # tied scores end up exactly like they would in the app
+        students = self.students
+        self.reset()
+        self.add_students(students)
+        self.search.flush()
+
+    def find_student(self, sid):
+        return self.index.get(sid)
+
+    def student_from_choice(self, text):
+        # dropdown text looks like "id - name" (or just an ID if it was typed)
+        return self.find_student(text.split(" - ")[0].strip())
+
+    # -------------------------------------------------------------
+    # Helpers: insert_student / remove_student / change_student
+    # EVERY add, delete and update goes through these three so the list,
+    # the ID index, the cached results, the ranking, the class stats and the
+    # dropdown search never get out of step.
+    # -------------------------------------------------------------
+    def insert_student(self, s):
+        self.students.append(s)
+        self.index[s.id] = s
+        self.forget_results(s)
+        self.ranking.add(s)
+        self.stats.add(s)
+        self.search.add(s)
+
+    def remove_student(self, s):
+        self.students.remove(s)
+        del self.index[s.id]
+        self.forget_results(s)
+        self.ranking.remove(s.id)
+        self.stats.remove(s)
+        self.search.remove(s.id)
+
+    def change_student(self, s, name, course_marks, exam_mark):
+        self.stats.remove(s)  # take the OLD marks out before they're overwritten
+        s.name = name
+        s.course_marks = shared_marks(course_marks)
+        s.exam_mark = exam_mark
+        self.forget_results(s)
+        self.ranking.update(s)
+        self.stats.add(s)
+        self.search.update(s)
+
+    # -------------------------------------------------------------
+    # Writing the database
+    # It writes to a temp file first and then renames it over database.txt,
+    # so a crash halfway through never leaves a half-written database.
+    # Once that's done the journal isn't needed anymore.
+    # Source for os.replace: https://docs.python.org/3/library/os.html#os.replace
+    # -------------------------------------------------------------
+    @timed("write_database")
+    def write_database(self, lines):
+        tmp_path = self.file_path + ".tmp"
+        binary = self.file_path.endswith(BINARY_EXT)
+        try:
+            with open(tmp_path, "wb" if binary else "w") as f:
+                if binary:
+                    BinaryStudentFile.write_to(f, [line.split(',') for line in lines])
+                else:
+                    f.write(f"{len(lines)}\n")
+                    for line in lines:
+                        f.write(line + "\n")
+                f.flush()
+                os.fsync(f.fileno())  # make sure it's really on disk before the rename
+            os.replace(tmp_path, self.file_path)  # atomic - old file or new file, never half
+        except Exception:
+            # the database itself is untouched - just don't leave the half-written copy around
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        
+        old_journal = self.journal_path + ".old"
+        if os.path.exists(old_journal):
+            os.remove(old_journal)
+
+    # -------------------------------------------------------------
+    # JOURNAL (write-ahead log)
+    # Every add/update/delete is appended as ONE short line:
+    #     A,id,name,cw1,cw2,cw3,exam   (add)
+    #     U,id,name,cw1,cw2,cw3,exam   (update)
+    #     D,id                         (delete)
+    # so an edit costs the same no matter how many students there are.
+    # The journal is renamed to journal.old while it's being folded back
+    # into the database; if that doesn't finish, journal.old is replayed too.
+    # -------------------------------------------------------------
+    def read_journal(self):
+        # runs on the worker thread - returns the split lines for apply_change
+        if self.store:
+            return []  # SQLite commits every edit straight away, no journal
+        # journal.old is left behind if we crashed while compacting - replay it first
+        return (read_journal_file(self.journal_path + ".old") +
+                read_journal_file(self.journal_path))
+
+    def replay_journal(self, entries):
+        self.journal_count = 0
+        for data in entries:
+            try:
+                self.apply_change(data)
+            except (ValueError, IndexError):
+                continue  # broken line - ignore it like the loader does
+            self.journal_count += 1
+        self.columns = None
+
+    def apply_change(self, data):
+        op, sid = data[0], data[1]
+        student = self.index.get(sid)
+        if op == 'D':
+            if student:
+                self.remove_student(student)
+        elif op in ('A', 'U') and len(data) >= 7:
+            # replaying the same line twice gives the same result, so it's safe
+            # to replay a journal that was already half compacted
+            new = self.parse_student(data[1:])
+            if student:
+                self.change_student(student, new.name, new.course_marks, new.exam_mark)
+            else:
+                self.insert_student(new)
+
+    def rotate_journal(self):
+        if not os.path.exists(self.journal_path):
+            return
+        old_journal = self.journal_path + ".old"
+        if os.path.exists(old_journal):
+            # an earlier compaction didn't finish - keep both sets of edits
+            with open(self.journal_path, "r") as src, open(old_journal, "a") as dst:
+                dst.write(src.read())
+            os.remove(self.journal_path)
+        else:
+            os.replace(self.journal_path, old_journal)
+
+    # -------------------------------------------------------------
+    # Helper: check_fits
+    # A .bin database has fixed-size ID and name fields (see
+    # BinaryStudentFile), so anything longer is turned away when it's
+    # typed/imported instead of failing the next save. Returns an error or None.
+    # -------------------------------------------------------------
+    def check_fits(self, student_id, name):
+        if self.file_path.endswith(BINARY_EXT) and not BinaryStudentFile.fits(student_id, name):
+            return (f"ID must be at most {BinaryStudentFile.ID_BYTES} bytes and Name at most "
+                    f"{BinaryStudentFile.NAME_BYTES} bytes in a binary database!")
+        return None
+
+    # -------------------------------------------------------------
+    # Helper: import_batch
+    # Duplicate check + insert for one batch from read_import_batches.
+    # Good students are added to the roster and to `imported`, rejected
+    # rows are added to `errors` as lines for the error report.
+    # -------------------------------------------------------------
+    def import_batch(self, batch, imported, errors):
+        for line_no, raw, student, error in batch:
+            if student and student.id in self.index:
+                student, error = None, "Student ID already exists!"
+            elif student:
+                error = self.check_fits(student.id, student.name)
+                if error:
+                    student = None
+            if student:
+                self.insert_student(student)
+                imported.append(student)
+            else:
+                errors.append(f"line {line_no}: {error} -> {raw}\n")
+
+    # -------------------------------------------------------------
+    # Function: calculate_results
+    # Purpose: Compute total, percentage, and grade for a student
+    # -------------------------------------------------------------
+    def calculate_results(self, s):
+        return grade_marks(sum(s.course_marks), s.exam_mark)
+
+    # -------------------------------------------------------------
+    # Helper: get_results
+    # Same as calculate_results but remembers the answer on the record
+    # itself, so sorting/highest/lowest/cards don't redo the maths every
+    # time. It's NOT kept per ID: a file can have two rows with the same ID
+    # and each one needs its own results. insert/remove/change_student call
+    # forget_results() - it also throws away the columnar copy so it gets rebuilt.
+    # Source (memoization idea): https://docs.python.org/3/library/functools.html#functools.lru_cache
+    # -------------------------------------------------------------
+    def get_results(self, s):
+        results = s.results
+        if results is None:
+            results = s.results = self.calculate_results(s)
+        return results
+
+    def forget_results(self, s):
+        s.results = None
+        self.columns = None
+
+    # -------------------------------------------------------------
+    # Helper: get_columns
+    # Returns the columnar copy of the roster when NumPy is installed and
+    # the roster is big enough for it to be worth it, otherwise None.
+    # -------------------------------------------------------------
+    def get_columns(self):
+        if len(self.students) < COLUMNAR_MIN_STUDENTS or load_numpy() is None:
+            return None
+        if self.columns is None:
+            self.columns = ColumnarStudents.from_students(self.students)
+        return self.columns
+
+    # -------------------------------------------------------------
+    # Aggregate helpers used by the Highest/Lowest/Sort buttons
+    # -------------------------------------------------------------
+    def use_store(self):
+        # SQLite answers these from its index, but only once it's fully loaded
+        # (an import only reaches SQLite at the end, so not during one either)
+        return self.store is not None and not self.loading and not self.busy
+
+    def highest_student(self):
+        if self.use_store():
+            student = self.find_student(self.store.highest_id())
+            if student:
+                return student
+        return self.ranking.highest()
+
+    def lowest_student(self):
+        if self.use_store():
+            student = self.find_student(self.store.lowest_id())
+            if student:
+                return student
+        return self.ranking.lowest()
+
+    @timed("sort")
+    def sort_students(self, reverse=False):
+        # a sorted COPY of the whole list (duplicate IDs included) for writing out
+        cols = self.get_columns()
+        if cols is not None:
+            return [self.students[i] for i in cols.argsort(reverse)]
+        return sorted(self.students, key=lambda s: self.get_results(s)[2], reverse=reverse)
+
+    @timed("sorted_view")
+    def sorted_records(self, reverse=False):
+        # a view for the window - doesn't reorder self.students. Used with
+        # SQLite too, the ranking is kept in memory either way
+        return RankedView(self.ranking, reverse)
+
+
+# -------------------------------------------------------------
+# CLASS TOTALS
+# Everything the report needs in one small dict, so totals from
+# different chunks of a file can be added together afterwards.
+# highest/lowest are (percent, id, name) - the FIRST student wins a tie.
+# -------------------------------------------------------------
+def new_totals():
+    return {'count': 0, 'percent_sum': 0.0, 'grades': dict.fromkeys('ABCDF', 0),
+            'highest': None, 'lowest': None, 'skipped': 0}
+
+
+def add_result(totals, sid, name, percent, grade):
+    totals['count'] += 1
+    totals['percent_sum'] += percent
+    totals['grades'][grade] += 1
+    if totals['highest'] is None or percent > totals['highest'][0]:
+        totals['highest'] = (percent, sid, name)
+    if totals['lowest'] is None or percent < totals['lowest'][0]:
+        totals['lowest'] = (percent, sid, name)
+
+
+def merge_totals(totals, more):
+    # `more` must come from LATER in the file so ties still go to the first student
+    totals['count'] += more['count']
+    totals['percent_sum'] += more['percent_sum']
+    totals['skipped'] += more['skipped']
+    for grade, n in more['grades'].items():
+        totals['grades'][grade] += n
+    for key, better in (('highest', lambda a, b: a > b), ('lowest', lambda a, b: a < b)):
+        if more[key] and (totals[key] is None or better(more[key][0], totals[key][0])):
+            totals[key] = more[key]
+
+
+# -------------------------------------------------------------
+# BATCH GRADING (several processes)
+# For end-of-term runs over millions of students. The text database is
+# cut into byte ranges that start and end on line boundaries, each range
+# is graded in its own process (so the GIL doesn't matter), and only the
+# small totals - plus the graded lines when sorted output is wanted -
+# come back to be merged. The journal is NOT replayed here, so save
+# (close Student Manager) before a batch run.
+# Source: https://docs.python.org/3/library/concurrent.futures.html#processpoolexecutor
+# Source for heapq.merge: https://docs.python.org/3/library/heapq.html#heapq.merge
+# -------------------------------------------------------------
+def split_byte_ranges(path, parts):
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        header = f.readline()
+        start = len(header) if header.strip().isdigit() else 0  # skip the count line
+        bounds = [start]
+        for i in range(1, parts):
+            pos = max(start + (size - start) * i // parts, bounds[-1])
+            if pos > 0:
+                f.seek(pos - 1)
+                f.readline()  # move on to the start of the next line
+                pos = f.tell()
+            bounds.append(min(pos, size))
+        bounds.append(size)
+    return [(a, b) for a, b in zip(bounds, bounds[1:]) if b > a]
+
+
+def grade_byte_range(path, start, stop, keep_rows=False, reverse=False):
+    # runs in a worker process - returns (totals, rows sorted by total)
+    totals = new_totals()
+    rows = []
+    with open(path, "rb") as f:
+        f.seek(start)
+        lines = f.read(stop - start).decode().splitlines()
+    for line in lines:
+        data = line.strip().split(',')
+        try:
+            c_total, total, percent, grade = grade_marks(
+                int(data[2]) + int(data[3]) + int(data[4]), int(data[5]))
+        except (ValueError, IndexError):
+            totals['skipped'] += int(bool(line.strip()))  # broken line (blank ones don't count)
+            continue
+        add_result(totals, data[0], data[1], percent, grade)
+        if keep_rows:
+            rows.append((total, line.strip()))
+    rows.sort(key=lambda row: row[0], reverse=reverse)  # sort is stable, so file order is kept on ties
+    return totals, rows
+
+
+def batch_grade(path, workers=None, out_path=None, reverse=False):
+    workers = workers or os.cpu_count() or 1
+    # a few ranges per worker so one slow chunk doesn't hold up the rest
+    ranges = split_byte_ranges(path, workers * 4)
+    jobs = [(path, a, b, out_path is not None, reverse) for a, b in ranges]
+    if workers == 1:
+        parts = [grade_byte_range(*job) for job in jobs]
+    else:
+        # imported here - it pulls in multiprocessing, which only batch needs
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(workers) as pool:
+            parts = list(pool.map(grade_byte_range, *zip(*jobs)))
+    
+    totals = new_totals()
+    for part_totals, _ in parts:  # in file order
+        merge_totals(totals, part_totals)
+    
+    if out_path:
+        # every chunk is already sorted, so merging them is one pass
+        merged = heapq.merge(*(rows for _, rows in parts), key=lambda row: row[0], reverse=reverse)
+        with open(out_path + ".tmp", "w") as f:
+            f.write(f"{totals['count']}\n")
+            for batch in iter(lambda: list(itertools.islice(merged, LOAD_CHUNK)), []):
+                f.write(''.join(line + "\n" for _, line in batch))
+        os.replace(out_path + ".tmp", out_path)
+    return totals
+
+
+# -------------------------------------------------------------
+# COMMAND LINE
+# Batch grading, sorting and reports without opening a window.
+# -------------------------------------------------------------
+def print_grades(roster, out):
+    out.write("id,name,coursework,exam,total,percent,grade\n")
+    # big rosters are graded in one vectorized pass instead of per student
+    cols = roster.get_columns()
+    for start in range(0, len(roster.students), LOAD_CHUNK):
+        chunk = roster.students[start:start + LOAD_CHUNK]
+        if cols is not None:
+            results = cols.results_range(start, start + len(chunk))
+        else:
+            results = map(roster.get_results, chunk)
+        rows = []
+        for s, (c_total, total, percent, grade) in zip(chunk, results):
+            rows.append(f"{s.id},{s.name},{c_total},{s.exam_mark},{total},{percent:.2f},{grade}\n")
+        out.write(''.join(rows))
+
+
+def print_report(totals, out):
+    if not totals['count']:
+        out.write("No student records found.\n")
+        return
+    out.write(f"Students: {totals['count']}\n")
+    out.write(f"Average: {totals['percent_sum'] / totals['count']:.2f}%\n")
+    for label in ('highest', 'lowest'):
+        percent, sid, name = totals[label]
+        out.write(f"{label.title()}: {name} ({sid}) {percent:.2f}%\n")
+    out.write("Grades: " + ", ".join(f"{g}={n}" for g, n in totals['grades'].items()) + "\n")
+    if totals['skipped']:
+        out.write(f"Skipped: {totals['skipped']} broken lines\n")
+
+
+def roster_totals(roster):
+    totals = new_totals()
+    cols = roster.get_columns()
+    if cols is not None:
+        # same totals as the loop below, without grading each student in Python
+        totals['count'] = len(cols)
+        totals['percent_sum'] = float(cols.percents.sum())
+        totals['grades'].update(cols.grade_counts())  # keeps the A-F order for the report
+        for label, i in (('highest', cols.argmax()), ('lowest', cols.argmin())):
+            s = roster.students[i]
+            totals[label] = (float(cols.percents[i]), s.id, s.name)
+        return totals
+    for s in roster.students:
+        c_total, total, percent, grade = roster.get_results(s)
+        add_result(totals, s.id, s.name, percent, grade)
+    return totals
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Student Manager without the window.")
+    parser.add_argument("--metrics", help="write timings for the run to this JSON file")
+    parser.add_argument("--profile", help="run under cProfile and save the stats to this file")
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    grade = commands.add_parser("grade", help="print every student's total, percentage and grade")
+    grade.add_argument("database")
+    order = commands.add_parser("sort", help="write the students ordered by percentage")
+    order.add_argument("database")
+    order.add_argument("--desc", action="store_true", help="highest first")
+    order.add_argument("--out", help="write a database file here instead of printing")
+    report = commands.add_parser("report", help="print a summary of the class")
+    report.add_argument("database")
+    batch = commands.add_parser("batch", help="grade a big text database with several processes")
+    batch.add_argument("database")
+    batch.add_argument("--workers", type=int, help="processes to use (default: one per CPU)")
+    batch.add_argument("--out", help="also write the students sorted by percentage here")
+    batch.add_argument("--desc", action="store_true", help="highest first in --out")
+    for name in ("to-binary", "to-csv"):
+        convert = commands.add_parser(name, help=f"convert the database {name.replace('-', ' ')}")
+        convert.add_argument("source")
+        convert.add_argument("target")
+    args = parser.parse_args(argv)
+    
+    metrics = Metrics()
+    if args.profile:
+        metrics.toggle_profile(args.profile)
+    try:
+        with metrics.timer("command_" + args.command):
+            run_command(args, metrics)
+    finally:
+        if args.profile:
+            metrics.toggle_profile(args.profile)  # stops and saves
+        if args.metrics:
+            metrics.dump(args.metrics)
+
+
+def run_command(args, metrics):
+    if args.command in ("to-binary", "to-csv"):
+        convert = convert_to_binary if args.command == "to-binary" else convert_to_csv
+        print(f"Converted {convert(args.source, args.target)} students to {args.target}")
+        return
+    if args.command == "batch":
+        if os.path.exists(args.database + ".journal"):
+            print("Note: the journal has edits that aren't in the database yet - "
+                  "close Student Manager first to include them.", file=sys.stderr)
+        print_report(batch_grade(args.database, args.workers, args.out, args.desc), sys.stdout)
+        return
+    
+    roster = StudentRoster(args.database)
+    roster.metrics = metrics
+    roster.load()
+    if args.command == "grade":
+        print_grades(roster, sys.stdout)
+    elif args.command == "report":
+        print_report(roster_totals(roster), sys.stdout)
+    else:
+        records = roster.sort_students(args.desc)
+        if args.out:
+            write_students_csv(args.out, records)
+        else:
+            sys.stdout.writelines(roster.student_line(s) + "\n" for s in records)
+    if roster.store:
+        roster.store.close()
+
+if __name__ == "__main__":
+    main()